@@ -1,32 +1,100 @@
 import os
+import importlib
 import logging
 
-from flask import Flask
+from flask import Flask, g
 from flask_login import LoginManager
 from flask_socketio import SocketIO
+from sqlalchemy.orm import configure_mappers
 from werkzeug.middleware.proxy_fix import ProxyFix
 from database import db
+from json_provider import ORJSON_AVAILABLE, OrjsonProvider
 from models import *
  
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Read the environment once at import
+_ENV = os.environ
+DATABASE_URL = _ENV.get("DATABASE_URL", "sqlite:///event_management.db")
+SESSION_SECRET = _ENV.get("SESSION_SECRET")
+REDIS_URL = _ENV.get("REDIS_URL")
+LOG_LEVEL = _ENV.get("LOG_LEVEL", "INFO").upper()
+USE_X_SENDFILE = _ENV.get("USE_X_SENDFILE") == "1"
+CHAT_ACCEL_REDIRECT_PREFIX = _ENV.get("CHAT_ACCEL_REDIRECT_PREFIX")
+DB_POOL_SIZE = int(_ENV.get("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(_ENV.get("DB_MAX_OVERFLOW", "40"))
+
+
+def configure_logging():
+    """Configure root logging (override with LOG_LEVEL=DEBUG when troubleshooting)"""
+    logging.basicConfig(level=LOG_LEVEL)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
 
 # Create the app
 app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+if SESSION_SECRET:
+    app.secret_key = SESSION_SECRET
+elif app.debug:
+    app.secret_key = "dev-secret-key-change-in-production"
+else:
+    raise RuntimeError("SESSION_SECRET must be set when not running with FLASK_DEBUG=1")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)  # needed for url_for to generate with https
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+# Emit keys in the order handlers build them; sorting every response object
+# (e.g. each message in a chat history page) is wasted work for API clients
+app.json.sort_keys = False
 
-# Initialize SocketIO for real-time features
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Initialize SocketIO for real-time features. REDIS_URL enables the Redis
+# pub/sub message queue so broadcasts fan out across multiple workers; the
+# longer ping interval keeps idle presence connections cheap.
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    message_queue=REDIS_URL,
+    ping_interval=25,
+    ping_timeout=60,
+)
 
 # Configure the database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///event_management.db")
+app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
+    "future": True,
+    # Larger compiled-SQL cache so the many small ORM queries issued by the
+    # ticket/analytics/calendar blueprints are not recompiled after eviction
+    "query_cache_size": 2000,
 }
+if not DATABASE_URL.startswith("sqlite"):
+    # Size the connection pool for many concurrent chat/socket clients instead of
+    # the default 5 + 10, so bursts queue on the pool rather than reconnecting
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+    )
+    # Under eventlet workers psycopg2 blocks the hub during queries unless patched
+    try:
+        import eventlet.patcher
+        from psycogreen.eventlet import patch_psycopg
+        if eventlet.patcher.is_monkey_patched("socket"):
+            patch_psycopg()
+    except ImportError:
+        pass
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Shared with the chat manager, which keeps presence and typing state in Redis when set
+app.config["REDIS_URL"] = REDIS_URL
+
+# send_file() responses (e.g. chat attachments) normally hand the WSGI server a
+# file wrapper, which gunicorn serves with sendfile(2). Behind Apache mod_xsendfile
+# or lighttpd, USE_X_SENDFILE=1 lets the front-end server stream the file instead.
+app.config["USE_X_SENDFILE"] = USE_X_SENDFILE
+# Behind nginx, CHAT_ACCEL_REDIRECT_PREFIX names an `internal` location aliased to
+# the chat upload folder; chat downloads then return only an X-Accel-Redirect header.
+app.config["CHAT_ACCEL_REDIRECT_PREFIX"] = CHAT_ACCEL_REDIRECT_PREFIX
+
 # Initialize SQLAlchemy with the app
 db.init_app(app)
 
@@ -38,64 +106,82 @@ login_manager.login_message = 'Please log in to access this page.'
 
 # Import and register routes after app context is established
 def initialize_app():
+    configure_logging()
+    loaded = []
     with app.app_context():
-        import models  # noqa: F401
         from routes import register_routes
         
         # Register main routes
         register_routes(app)
         
-        # Register advanced feature blueprints
-        try:
-            from security_routes import security_bp
-            app.register_blueprint(security_bp)
-            print("✓ Security routes registered successfully")
-        except ImportError as e:
-            print(f"Warning: Could not import security routes: {e}")
+        # Collect feature blueprints first and register them together below
+        pending_blueprints = []
+        for module_name, blueprint_name in (
+            ('security_routes', 'security_bp'),
+            ('ticket_routes', 'ticket_bp'),
+            ('analytics_dashboard', 'analytics_bp'),
+        ):
+            try:
+                module = importlib.import_module(module_name)
+                pending_blueprints.append((module_name, getattr(module, blueprint_name)))
+            except ImportError as e:
+                logger.warning("Could not import %s: %s", module_name, e)
         
         # Register WebSocket handlers
         try:
             import websocket_handlers
             websocket_handlers.register_handlers(socketio)
-            print("✓ WebSocket handlers registered successfully")
+            loaded.append('websocket_handlers')
         except ImportError as e:
-            print(f"Warning: Could not import websocket handlers: {e}")
+            logger.warning("Could not import websocket handlers: %s", e)
         
         # Register WebRTC routes and handlers
         try:
             from webrtc_routes import register_webrtc_routes
             register_webrtc_routes(app)
-            print("✓ WebRTC routes registered successfully")
+            loaded.append('webrtc_routes')
         except ImportError as e:
-            print(f"Warning: Could not import WebRTC routes: {e}")
+            logger.warning("Could not import WebRTC routes: %s", e)
         
         try:
             from webrtc_websockets import register_webrtc_websocket_handlers
             register_webrtc_websocket_handlers(socketio)
-            print("✓ WebRTC WebSocket handlers registered successfully")
+            loaded.append('webrtc_websockets')
         except ImportError as e:
-            print(f"Warning: Could not import WebRTC WebSocket handlers: {e}")
+            logger.warning("Could not import WebRTC WebSocket handlers: %s", e)
         
         # Initialize security system
         try:
             from security_manager import initialize_security_system
             security_components = initialize_security_system()
             app.config['SECURITY_MANAGER'] = security_components
-            print("✓ Security system initialized successfully")
+            loaded.append('security_system')
         except ImportError as e:
-            print(f"Warning: Could not initialize security system: {e}")
+            logger.warning("Could not initialize security system: %s", e)
         
         # Initialize email notification service
         try:
             from email_notifications import email_service
             email_service.init_app(app)
-            print("✓ Email notification service initialized successfully")
+            loaded.append('email_service')
         except ImportError as e:
-            print(f"Warning: Could not initialize email service: {e}")
+            logger.warning("Could not initialize email service: %s", e)
         
-        # Create database tables
+        # Werkzeug only re-sorts the URL map on the next bind, so registering the
+        # collected blueprints back to back builds the rule table once
+        for module_name, blueprint in pending_blueprints:
+            app.register_blueprint(blueprint)
+            loaded.append(module_name)
+
+        # Compile all mappers in one pass now that every model module is imported,
+        # instead of lazily on the first query a worker serves
+        configure_mappers()
+
+        # Create database tables, then upgrade chat tables created by older versions
         db.create_all()
-        print("✓ Database tables created successfully")
+        from models_chat import upgrade_chat_schema
+        upgrade_chat_schema()
+        loaded.append('database_tables')
         
         # Add development admin user if doesn't exist
         try:
@@ -110,14 +196,22 @@ def initialize_app():
                 admin_user.set_password('admin123')
                 db.session.add(admin_user)
                 db.session.commit()
-                print("✓ Admin user created: admin@eventsync.com / admin123")
+                logger.info("Admin user created: admin@eventsync.com / admin123")
         except Exception as e:
-            print(f"Note: Could not create admin user: {e}")
+            logger.info("Could not create admin user: %s", e)
+
+    logger.info("Initialized components: %s", ", ".join(loaded))
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Memoize per request/app context so repeated loads (e.g. socket events that
+    # re-authenticate) hit the DB once; db.session.get uses the identity map.
+    user_id = int(user_id)
+    cached = g.get('login_user_row')
+    if cached is None or cached[0] != user_id:
+        cached = g.login_user_row = (user_id, db.session.get(User, user_id))
+    return cached[1]
 
 # Initialize the app
 initialize_app()
@@ -138,49 +232,41 @@ if SUSTAINABILITY_AVAILABLE:
     register_assessment_routes(app)
     print("✅ Sustainability and Assessment routes registered successfully")
 
-# Register ticket system routes
-try:
-    from ticket_routes import ticket_bp
-    app.register_blueprint(ticket_bp)
-    print("✅ Ticket system routes registered successfully")
-except ImportError as e:
-    print(f"Warning: Could not import ticket routes: {e}")
-
-# Register analytics dashboard
-try:
-    from analytics_dashboard import analytics_bp
-    app.register_blueprint(analytics_bp)
-    print("✅ Analytics dashboard routes registered successfully")
-except ImportError as e:
-    print(f"Warning: Could not import analytics routes: {e}")
-
-# Note: Calendar and payment routes are registered in register_routes()
+# Note: Calendar and payment routes are registered in register_routes();
+# security, ticket and analytics blueprints are registered in initialize_app()
 
 
 if __name__ == '__main__':
-    print("🚀 Starting EVENTSYNC - Event Management System...")
-    print("📊 Features enabled:")
-    print("  • AI-Powered Matching & Recommendations")
-    print("  • Advanced Collaboration Tools")
-    print("  • Immersive Virtual Events (VR/AR)")
-    print("  • Comprehensive Analytics Dashboard")
-    print("  • Seamless Third-party Integrations")
-    print("  • Enhanced Security & Privacy (RBAC, 2FA, GDPR)")
-    print("  • Real-time Communication (WebSockets)")
-    print("  • Modern Drag-and-Drop UI/UX")
-    print("\n🌐 Access your application at: http://localhost:5000")
-    print("🔒 Admin Dashboard: http://localhost:5000/admin")
-    print("🛡️ Security Dashboard: http://localhost:5000/admin/security")
-    print("\n👤 Default Admin Login:")
-    print("  Email: admin@eventsync.com")
-    print("  Password: admin123")
-    print("\n" + "="*60)
+    # Debug mode enables the Werkzeug reloader (which re-imports the whole app in a
+    # child process) and the interactive debugger, so it is opt-in via FLASK_DEBUG=1.
+    # Production deployments should run: gunicorn -k eventlet -w $(nproc) app:app
+    debug = _ENV.get('FLASK_DEBUG', '0') == '1'
+
+    if debug:
+        print("🚀 Starting EVENTSYNC - Event Management System...")
+        print("📊 Features enabled:")
+        print("  • AI-Powered Matching & Recommendations")
+        print("  • Advanced Collaboration Tools")
+        print("  • Immersive Virtual Events (VR/AR)")
+        print("  • Comprehensive Analytics Dashboard")
+        print("  • Seamless Third-party Integrations")
+        print("  • Enhanced Security & Privacy (RBAC, 2FA, GDPR)")
+        print("  • Real-time Communication (WebSockets)")
+        print("  • Modern Drag-and-Drop UI/UX")
+        print("\n🌐 Access your application at: http://localhost:5000")
+        print("🔒 Admin Dashboard: http://localhost:5000/admin")
+        print("🛡️ Security Dashboard: http://localhost:5000/admin/security")
+        print("\n👤 Default Admin Login:")
+        print("  Email: admin@eventsync.com")
+        print("  Password: admin123")
+        print("\n" + "="*60)
     
     try:
         socketio.run(app, 
                     host='0.0.0.0', 
                     port=5000, 
-                    debug=True,
+                    debug=debug,
+                    use_reloader=debug,
                     allow_unsafe_werkzeug=True)
     except KeyboardInterrupt:
         print("\n👋 EVENTSYNC stopped gracefully")
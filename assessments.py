@@ -6,13 +6,28 @@ Hands-on challenges, mock event scenarios, and AI-powered feedback
 import json
 import logging
 import asyncio
+import bisect
+import functools
+import itertools
 import random
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Any, AsyncIterator, Optional, Sequence, Tuple
+from collections import deque
+from dataclasses import dataclass, fields, is_dataclass
 from enum import Enum
+from types import MappingProxyType
 import math
 
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from app import db
 from models import Event, User, EventAnalytics
 
@@ -59,7 +74,448 @@ class DecisionImpact(Enum):
     MAJOR_NEGATIVE = "major_negative"
     CRITICAL_FAILURE = "critical_failure"
 
-@dataclass
+# Base score and feedback message per impact level, built once at import
+_IMPACT_SCORES = {
+    DecisionImpact.CRITICAL_SUCCESS: 95,
+    DecisionImpact.MAJOR_POSITIVE: 85,
+    DecisionImpact.MINOR_POSITIVE: 75,
+    DecisionImpact.NEUTRAL: 60,
+    DecisionImpact.MINOR_NEGATIVE: 45,
+    DecisionImpact.MAJOR_NEGATIVE: 30,
+    DecisionImpact.CRITICAL_FAILURE: 15
+}
+
+_IMPACT_MESSAGES = {
+    DecisionImpact.CRITICAL_SUCCESS: "Excellent decision! This choice demonstrates exceptional event management skills.",
+    DecisionImpact.MAJOR_POSITIVE: "Great choice! This decision shows strong understanding of event planning principles.",
+    DecisionImpact.MINOR_POSITIVE: "Good decision. This choice addresses the key requirements effectively.",
+    DecisionImpact.NEUTRAL: "Reasonable choice. This decision is acceptable but may have missed optimization opportunities.",
+    DecisionImpact.MINOR_NEGATIVE: "This choice has some drawbacks. Consider the potential consequences more carefully.",
+    DecisionImpact.MAJOR_NEGATIVE: "This decision could create significant challenges for your event.",
+    DecisionImpact.CRITICAL_FAILURE: "This choice could jeopardize the entire event. Reconsider your approach."
+}
+
+_POSITIVE_IMPACTS = frozenset((DecisionImpact.CRITICAL_SUCCESS, DecisionImpact.MAJOR_POSITIVE))
+
+_NEGATIVE_IMPACTS = frozenset((
+    DecisionImpact.MINOR_NEGATIVE, DecisionImpact.MAJOR_NEGATIVE, DecisionImpact.CRITICAL_FAILURE
+))
+
+_SEVERE_NEGATIVE_IMPACTS = frozenset((DecisionImpact.MAJOR_NEGATIVE, DecisionImpact.CRITICAL_FAILURE))
+
+# Suggestions offered when a decision had a negative impact
+_IMPROVEMENT_SUGGESTIONS = MappingProxyType({
+    "venue_selection": (
+        "Consider venue capacity relative to expected attendance",
+        "Factor in accessibility requirements for all attendees",
+        "Evaluate venue's technical capabilities for your event needs",
+        "Review venue's track record and references from similar events"
+    ),
+    "catering_strategy": (
+        "Consider dietary restrictions and preferences of your audience",
+        "Factor in service timing and logistics for meal service",
+        "Evaluate catering quality vs. budget trade-offs",
+        "Plan for contingencies like last-minute attendance changes"
+    ),
+    "marketing_channel": (
+        "Analyze your target audience's media consumption habits",
+        "Calculate expected return on investment for each channel",
+        "Consider integrated marketing approaches vs. single channels",
+        "Test marketing messages before full campaign launch"
+    ),
+    "crisis_response": (
+        "Develop crisis communication protocols in advance",
+        "Create decision trees for common crisis scenarios",
+        "Establish clear escalation procedures",
+        "Practice crisis response through scenario planning"
+    )
+})
+
+# Projected consequences of a decision: the neutral baseline and the overrides per impact
+_CONSEQUENCE_BASE = MappingProxyType({
+    "budget_impact": 0,
+    "timeline_impact": 0,
+    "attendee_satisfaction": 0,
+    "risk_level": "medium",
+    "reputation_impact": 0
+})
+
+_CONSEQUENCES_BY_IMPACT = MappingProxyType({
+    DecisionImpact.CRITICAL_SUCCESS: MappingProxyType({
+        "budget_impact": 5,  # Positive impact
+        "attendee_satisfaction": 20,
+        "risk_level": "low",
+        "reputation_impact": 15
+    }),
+    DecisionImpact.MAJOR_POSITIVE: MappingProxyType({
+        "budget_impact": 2,
+        "attendee_satisfaction": 10,
+        "risk_level": "low",
+        "reputation_impact": 8
+    }),
+    DecisionImpact.MAJOR_NEGATIVE: MappingProxyType({
+        "budget_impact": -15,
+        "timeline_impact": -5,
+        "attendee_satisfaction": -15,
+        "risk_level": "high",
+        "reputation_impact": -10
+    }),
+    DecisionImpact.CRITICAL_FAILURE: MappingProxyType({
+        "budget_impact": -25,
+        "timeline_impact": -10,
+        "attendee_satisfaction": -25,
+        "risk_level": "critical",
+        "reputation_impact": -20
+    })
+})
+
+# Trade-off summaries for the options of each decision, quoted when suggesting alternatives
+_OPTION_ANALYSES = MappingProxyType({
+    "venue_selection": MappingProxyType({
+        "premium": "Higher cost but superior attendee experience and fewer logistical issues",
+        "standard": "Balanced approach with predictable outcomes and manageable costs",
+        "alternative": "Creative differentiation but requires more planning and risk management"
+    }),
+    "catering_strategy": MappingProxyType({
+        "full_service": "Highest attendee satisfaction but premium pricing",
+        "buffet": "Cost-effective with good variety but requires space planning",
+        "food_trucks": "Unique experience with Instagram-worthy moments but coordination complexity"
+    }),
+    "marketing_channel": MappingProxyType({
+        "social_media": "Cost-effective reach with engagement metrics and targeting options",
+        "traditional": "Professional credibility with established audience reach",
+        "influencer": "Authentic endorsements with potential viral reach but variable reliability"
+    })
+})
+
+_NO_ANALYSES = MappingProxyType({})
+_DEFAULT_OPTION_ANALYSIS = "Alternative approach with different trade-offs"
+
+_BEST_PRACTICES = MappingProxyType({
+    "venue_selection": (
+        "Visit venues in person before making final decisions",
+        "Review contracts carefully for hidden fees and restrictions",
+        "Confirm backup plans for outdoor venues",
+        "Verify insurance requirements and liability coverage"
+    ),
+    "catering_strategy": (
+        "Conduct tasting sessions before finalizing menus",
+        "Plan for 10-15% more food than confirmed attendees",
+        "Accommodate dietary restrictions and cultural preferences",
+        "Coordinate catering timeline with event schedule"
+    ),
+    "marketing_channel": (
+        "Start marketing campaigns 6-8 weeks before event",
+        "Create compelling calls-to-action with clear value propositions",
+        "Track conversion metrics and adjust strategies accordingly",
+        "Leverage early bird pricing to drive initial momentum"
+    ),
+    "crisis_response": (
+        "Communicate transparently with stakeholders about issues",
+        "Have contingency plans prepared for common problems",
+        "Document all crisis decisions for post-event analysis",
+        "Follow up with affected parties to maintain relationships"
+    )
+})
+
+_GENERAL_BEST_PRACTICES = (
+    "Research thoroughly before making decisions",
+    "Consider long-term implications of choices",
+    "Get input from experienced team members",
+    "Document decisions for future reference"
+)
+
+# Score and rationale commentary appended to the impact message, best first
+_SCORE_SUFFIXES = (
+    " Your score reflects mastery-level decision making.",
+    " Your score shows strong competency in this area.",
+    " Your score indicates good understanding with room for improvement.",
+    " Your score suggests you grasp the basics but need more practice.",
+    " Your score indicates this is an area requiring significant development."
+)
+
+_RATIONALE_SUFFIXES = (
+    " Your detailed rationale shows thoughtful consideration of the decision.",
+    " Good job providing rationale for your decision.",
+    " Try to provide more detailed rationale to demonstrate your thinking process.",
+    " Consider providing rationale for your decisions to show your thought process."
+)
+
+# Lower bounds of the score bands above, ascending (90+ is mastery, below 60 needs work)
+_SCORE_THRESHOLDS = (60, 70, 80, 90)
+
+# Every possible feedback text, built once and interned so stored feedback shares
+# one string object per combination: impact -> [score bucket][rationale bucket]
+_FEEDBACK_GRID = MappingProxyType({
+    impact: tuple(
+        tuple(sys.intern(message + score_suffix + rationale_suffix)
+              for rationale_suffix in _RATIONALE_SUFFIXES)
+        for score_suffix in _SCORE_SUFFIXES
+    )
+    for impact, message in _IMPACT_MESSAGES.items()
+})
+
+def _score_bucket(score: float) -> int:
+    """Index into _SCORE_SUFFIXES for a decision score"""
+    return len(_SCORE_THRESHOLDS) - bisect.bisect_right(_SCORE_THRESHOLDS, score)
+
+def _rationale_bucket(rationale: str) -> int:
+    """Index into _RATIONALE_SUFFIXES for a decision rationale"""
+    if not rationale:
+        return 3
+    elif len(rationale) > 100:
+        return 0
+    elif len(rationale) > 50:
+        return 1
+    return 2
+
+_HIGH_TOUCH_EVENTS = frozenset(("Wedding Reception", "Charity Gala"))
+_CORPORATE_EVENTS = frozenset(("Corporate Conference", "Product Launch"))
+
+def _cost_per_person(constraints: Dict) -> float:
+    attendees = constraints.get("attendees", 300)
+    return constraints.get("budget", 50000) / attendees if attendees > 0 else 0
+
+# Decision impact rules: (decision id, choice) -> rule over the scenario context the
+# decision is judged against. Choices without a rule fall back to _RULE_DEFAULTS.
+_DECISION_RULES: Dict[Tuple[str, str], Callable[[Any], DecisionImpact]] = {
+    # Venue: premium pays off with a large budget or crowd; alternatives suit small events
+    ("venue_selection", "premium"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if c.get("budget", 50000) > 100000
+        else DecisionImpact.MINOR_POSITIVE if c.get("attendees", 300) > 500
+        else DecisionImpact.MINOR_NEGATIVE),
+    ("venue_selection", "standard"): lambda c: DecisionImpact.MINOR_POSITIVE,
+    ("venue_selection", "alternative"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if c.get("attendees", 300) < 200 else DecisionImpact.MINOR_NEGATIVE),
+    # Catering: full service needs room in the per-person budget
+    ("catering_strategy", "full_service"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if _cost_per_person(c) > 100 else DecisionImpact.MAJOR_NEGATIVE),
+    ("catering_strategy", "buffet"): lambda c: DecisionImpact.MINOR_POSITIVE,
+    ("catering_strategy", "food_trucks"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if c.get("attendees", 300) < 500 else DecisionImpact.MINOR_NEGATIVE),
+    # Marketing: assume 15% of the budget goes to marketing
+    ("marketing_channel", "social_media"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if c.get("attendees", 300) < 1000 else DecisionImpact.MINOR_POSITIVE),
+    ("marketing_channel", "traditional"): lambda c: (
+        DecisionImpact.MINOR_POSITIVE if c.get("budget", 50000) * 0.15 > 5000 else DecisionImpact.MINOR_NEGATIVE),
+    ("marketing_channel", "influencer"): lambda c: (
+        DecisionImpact.MINOR_NEGATIVE if c.get("attendees", 300) < 500 else DecisionImpact.MINOR_POSITIVE),
+    # Crisis: severity is the number of complications in play
+    ("crisis_response", "immediate"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if len(c) > 2 else DecisionImpact.MINOR_POSITIVE),
+    ("crisis_response", "consult"): lambda c: (
+        DecisionImpact.MINOR_POSITIVE if len(c) <= 2 else DecisionImpact.MINOR_NEGATIVE),
+    ("crisis_response", "postpone"): lambda c: (
+        DecisionImpact.MINOR_POSITIVE if len(c) > 3 else DecisionImpact.MAJOR_NEGATIVE),
+    # Budget cuts: different events prioritize different aspects
+    ("budget_reallocation", "marketing"): lambda c: (
+        DecisionImpact.MAJOR_POSITIVE if c.get("event_type", "Corporate Conference") in _HIGH_TOUCH_EVENTS
+        else DecisionImpact.MINOR_NEGATIVE),
+    ("budget_reallocation", "venue"): lambda c: (
+        DecisionImpact.MAJOR_NEGATIVE if c.get("event_type", "Corporate Conference") in _HIGH_TOUCH_EVENTS
+        else DecisionImpact.MINOR_NEGATIVE),
+    ("budget_reallocation", "catering"): lambda c: (
+        DecisionImpact.MINOR_POSITIVE if c.get("event_type", "Corporate Conference") in _CORPORATE_EVENTS
+        else DecisionImpact.MINOR_NEGATIVE),
+}
+
+# decision id -> (scenario context key the rules read, its default, impact for unruled choices)
+_RULE_CONTEXT = {
+    "venue_selection": ("constraints", {}, DecisionImpact.NEUTRAL),
+    "catering_strategy": ("constraints", {}, DecisionImpact.NEUTRAL),
+    "marketing_channel": ("constraints", {}, DecisionImpact.NEUTRAL),
+    "crisis_response": ("complications", [], DecisionImpact.NEUTRAL),
+    # Budget cuts always have some impact
+    "budget_reallocation": ("constraints", {}, DecisionImpact.MINOR_NEGATIVE),
+}
+
+def _apply_rules(decision_id: str, choice: str, scenario_context: Dict) -> DecisionImpact:
+    """Evaluate the impact rule for a decision choice against the scenario"""
+    context = _RULE_CONTEXT.get(decision_id)
+    if not context:
+        return DecisionImpact.NEUTRAL
+    
+    context_key, default, fallback = context
+    rule = _DECISION_RULES.get((decision_id, choice))
+    if rule is None:
+        return fallback
+    return rule(scenario_context.get(context_key, default))
+
+def _freeze(value):
+    """Read-only copy of nested template data: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _thaw(value):
+    """Plain, mutable copy of frozen template data: mappingproxies become dicts, tuples lists"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+# Scenario templates shared by every generated scenario. Frozen all the way down,
+# since the same entries end up in every scenario's decision points
+_DECISION_TEMPLATES = _freeze({
+    AssessmentCategory.PLANNING: (
+        {
+            "id": "venue_selection",
+            "title": "Venue Selection",
+            "description": "Choose the best venue option",
+            "options": [
+                {"id": "premium", "text": "Premium venue (+50% cost, best amenities)"},
+                {"id": "standard", "text": "Standard venue (budget-friendly, adequate)"},
+                {"id": "alternative", "text": "Non-traditional venue (unique, potential risks)"}
+            ]
+        },
+        {
+            "id": "catering_strategy",
+            "title": "Catering Strategy",
+            "description": "Select catering approach",
+            "options": [
+                {"id": "full_service", "text": "Full-service catering (highest cost, no hassle)"},
+                {"id": "buffet", "text": "Buffet style (medium cost, efficient)"},
+                {"id": "food_trucks", "text": "Multiple food trucks (trendy, coordination needed)"}
+            ]
+        }
+    ),
+    AssessmentCategory.MARKETING: (
+        {
+            "id": "marketing_channel",
+            "title": "Primary Marketing Channel",
+            "description": "Choose main marketing strategy",
+            "options": [
+                {"id": "social_media", "text": "Social media campaign (broad reach, cost-effective)"},
+                {"id": "traditional", "text": "Traditional advertising (targeted, higher cost)"},
+                {"id": "influencer", "text": "Influencer partnerships (trendy, variable ROI)"}
+            ]
+        },
+    ),
+    AssessmentCategory.CRISIS_MANAGEMENT: (
+        {
+            "id": "crisis_response",
+            "title": "Crisis Response Strategy",
+            "description": "How do you handle: {complication}",
+            "options": [
+                {"id": "immediate", "text": "Take immediate action (fast, potentially costly)"},
+                {"id": "consult", "text": "Consult with team first (measured, might delay)"},
+                {"id": "postpone", "text": "Consider postponing event (safe, disappointing)"}
+            ]
+        },
+    )
+})
+
+_ADVANCED_DECISIONS = _freeze((
+    {
+        "id": "budget_reallocation",
+        "title": "Budget Emergency",
+        "description": "Budget cut by 25% - where do you reduce spending?",
+        "options": [
+            {"id": "venue", "text": "Downgrade venue (impacts experience)"},
+            {"id": "catering", "text": "Reduce catering quality (attendee dissatisfaction)"},
+            {"id": "marketing", "text": "Cut marketing budget (lower attendance)"}
+        ]
+    },
+))
+
+_BASE_CRITERIA = _freeze((
+    {"metric": "budget_adherence", "target": 95, "weight": 0.3},
+    {"metric": "timeline_adherence", "target": 100, "weight": 0.2},
+    {"metric": "attendee_satisfaction", "target": 85, "weight": 0.3},
+    {"metric": "safety_compliance", "target": 100, "weight": 0.2}
+))
+
+_CATEGORY_CRITERIA = _freeze({
+    AssessmentCategory.MARKETING: (
+        {"metric": "registration_rate", "target": 80, "weight": 0.4},
+    ),
+    AssessmentCategory.SUSTAINABILITY: (
+        {"metric": "carbon_footprint_reduction", "target": 20, "weight": 0.3},
+    )
+})
+
+_BASE_OBJECTIVES = (
+    "Apply event planning fundamentals",
+    "Make data-driven decisions",
+    "Balance competing priorities",
+    "Manage stakeholder expectations"
+)
+
+_CATEGORY_OBJECTIVES = MappingProxyType({
+    AssessmentCategory.PLANNING: (
+        "Create comprehensive event timelines",
+        "Optimize resource allocation",
+        "Identify critical path dependencies"
+    ),
+    AssessmentCategory.MARKETING: (
+        "Design effective marketing campaigns",
+        "Calculate marketing ROI",
+        "Target appropriate audience segments"
+    ),
+    AssessmentCategory.CRISIS_MANAGEMENT: (
+        "Develop crisis response strategies",
+        "Communicate effectively under pressure",
+        "Minimize negative impact on event"
+    )
+})
+
+# Objectives, resources and client requirements are constant per key, so every
+# scenario shares the same tuple instead of allocating its own list
+_LEARNING_OBJECTIVES = MappingProxyType({
+    category: _BASE_OBJECTIVES + objectives for category, objectives in _CATEGORY_OBJECTIVES.items()
+})
+
+_BASE_RESOURCES = _freeze((
+    {"type": "document", "title": "Event Planning Checklist", "url": "/resources/checklist.pdf"},
+    {"type": "tool", "title": "Budget Calculator", "url": "/tools/budget-calc"},
+    {"type": "database", "title": "Vendor Directory", "url": "/vendors/search"}
+))
+
+# Beginner/intermediate scenarios also get the guides
+_GUIDED_RESOURCES = _BASE_RESOURCES + _freeze((
+    {"type": "guide", "title": "Best Practices Guide", "url": "/guides/best-practices"},
+    {"type": "template", "title": "Timeline Template", "url": "/templates/timeline"}
+))
+
+_BASE_CLIENT_REQUIREMENTS = (
+    "Professional photography/videography",
+    "High-quality catering",
+    "Reliable AV equipment",
+    "Comfortable seating arrangements",
+    "Easy parking access"
+)
+
+_CLIENT_REQUIREMENTS = MappingProxyType({
+    event_type: _BASE_CLIENT_REQUIREMENTS + requirements
+    for event_type, requirements in {
+        "Corporate Conference": (
+            "Live streaming capability",
+            "Breakout session rooms",
+            "High-speed WiFi",
+            "Presentation equipment",
+            "Networking area"
+        ),
+        "Wedding Reception": (
+            "Dance floor",
+            "Romantic lighting",
+            "Wedding cake table",
+            "Photo booth area",
+            "Bridal suite access"
+        ),
+        "Music Festival": (
+            "Multiple stages",
+            "Sound system for 5000+ people",
+            "Security barriers",
+            "Food vendor space",
+            "Emergency medical station"
+        )
+    }.items()
+})
+
+@dataclass(slots=True)
 class AssessmentScenario:
     """Assessment scenario definition"""
     id: str
@@ -69,23 +525,28 @@ class AssessmentScenario:
     difficulty: DifficultyLevel
     category: AssessmentCategory
     estimated_duration: int  # minutes
-    learning_objectives: List[str]
+    learning_objectives: Sequence[str]
     scenario_context: Dict[str, Any]
     decision_points: List[Dict[str, Any]]
     success_criteria: List[Dict[str, Any]]
-    resources_provided: List[Dict[str, Any]]
+    resources_provided: Sequence[Dict[str, Any]]
 
-@dataclass
+@dataclass(slots=True)
 class UserDecision:
     """User decision in assessment"""
     decision_id: str
     choice_made: str
     rationale: Optional[str]
-    timestamp: datetime
+    timestamp_ms: int  # epoch milliseconds (UTC)
     time_taken: int  # seconds
     confidence_level: float  # 0-1
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Decision time as a naive UTC datetime"""
+        return datetime.fromtimestamp(self.timestamp_ms / 1000, timezone.utc).replace(tzinfo=None)
 
-@dataclass
+@dataclass(slots=True)
 class DecisionFeedback:
     """AI feedback on user decision"""
     decision_id: str
@@ -94,10 +555,10 @@ class DecisionFeedback:
     feedback_text: str
     improvement_suggestions: List[str]
     alternative_approaches: List[str]
-    industry_best_practices: List[str]
+    industry_best_practices: Sequence[str]
     consequences: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class AssessmentResult:
     """Complete assessment result"""
     assessment_id: str
@@ -150,35 +611,161 @@ class MockEventScenarioGenerator:
         "Technology platform crashed"
     ]
     
-    def generate_scenario(self, difficulty: DifficultyLevel, category: AssessmentCategory) -> AssessmentScenario:
-        """Generate a random assessment scenario"""
-        
-        event_type = random.choice(self.EVENT_TYPES)
-        constraints = self._select_constraints(difficulty)
-        complications = self._select_complications(difficulty)
-        
-        scenario_id = f"scenario_{random.randint(10000, 99999)}"
+    CONSTRAINT_COUNTS = {
+        DifficultyLevel.BEGINNER: 2,
+        DifficultyLevel.INTERMEDIATE: 3,
+        DifficultyLevel.ADVANCED: 4,
+        DifficultyLevel.EXPERT: 5
+    }
+    
+    COMPLICATION_COUNTS = {
+        DifficultyLevel.BEGINNER: 1,
+        DifficultyLevel.INTERMEDIATE: 2,
+        DifficultyLevel.ADVANCED: 3,
+        DifficultyLevel.EXPERT: 4
+    }
+    
+    MARKET_CONDITION_OPTIONS = {
+        "venue_availability": ["high", "medium", "low"],
+        "vendor_pricing": ["competitive", "average", "premium"],
+        "demand_level": ["low", "medium", "high"],
+        "economic_climate": ["recession", "stable", "growth"],
+        "seasonal_factors": ["peak_season", "off_season", "shoulder_season"]
+    }
+    
+    RESOURCE_OPTIONS = {
+        "experience_level": ["junior", "mixed", "senior"],
+        "vendor_relationships": ["new", "established", "premium"],
+        "technology_access": ["basic", "standard", "advanced"]
+    }
+    
+    def __init__(self, seed: Optional[int] = None):
+        # Private PRNG so draws are reproducible per generator and do not contend
+        # on the module-level random state
+        self._rng = random.Random(seed)
+    
+    def generate_scenario(self, difficulty: DifficultyLevel, category: AssessmentCategory,
+                          seed: Optional[int] = None) -> AssessmentScenario:
+        """Generate a random assessment scenario (pass seed for a deterministic one)"""
+        # A seeded call draws from its own PRNG, leaving the shared one untouched
+        rng = random.Random(seed) if seed is not None else self._rng
+        
+        return self._assemble_scenario(
+            scenario_id=f"scenario_{rng.randint(10000, 99999)}",
+            event_type=rng.choice(self.EVENT_TYPES),
+            constraints=self._select_constraints(rng, difficulty),
+            complications=self._select_complications(rng, difficulty),
+            market_conditions=self._generate_market_conditions(rng),
+            available_resources=self._generate_available_resources(rng),
+            difficulty=difficulty,
+            category=category
+        )
+    
+    def generate_scenarios_bulk(self, n: int, difficulty: DifficultyLevel,
+                                category: AssessmentCategory) -> List[AssessmentScenario]:
+        """Generate many scenarios, drawing all random picks in a few NumPy calls"""
+        if n <= 0:
+            return []
+        
+        rng = np.random.default_rng(self._rng.getrandbits(64))
+        constraint_count = self.CONSTRAINT_COUNTS[difficulty]
+        complication_count = self.COMPLICATION_COUNTS[difficulty]
+        
+        scenario_ids = rng.integers(10000, 100000, n)
+        event_idx = rng.integers(0, len(self.EVENT_TYPES), n)
+        # Sampling without replacement per row: take the first k of a random permutation
+        constraint_idx = np.argsort(rng.random((n, len(self.CONSTRAINTS))), axis=1)[:, :constraint_count]
+        constraint_draws = rng.random((n, constraint_count))
+        complication_idx = np.argsort(rng.random((n, len(self.COMPLICATIONS))), axis=1)[:, :complication_count]
+        market_idx = rng.integers(0, 3, (n, len(self.MARKET_CONDITION_OPTIONS)))
+        resource_idx = rng.integers(0, 3, (n, len(self.RESOURCE_OPTIONS)))
+        team_sizes = rng.integers(2, 11, n)
+        emergency_budgets = rng.integers(1000, 10001, n)
+        
+        scenarios = []
+        for i in range(n):
+            constraints = {}
+            for j, c in enumerate(constraint_idx[i]):
+                constraint = self.CONSTRAINTS[c]
+                values = self._constraint_values(constraint, difficulty)
+                constraints[constraint["type"]] = values[int(constraint_draws[i, j] * len(values))]
+            
+            market_conditions = {
+                key: options[market_idx[i, k]]
+                for k, (key, options) in enumerate(self.MARKET_CONDITION_OPTIONS.items())
+            }
+            picks = {
+                key: options[resource_idx[i, k]]
+                for k, (key, options) in enumerate(self.RESOURCE_OPTIONS.items())
+            }
+            available_resources = {
+                "team_size": int(team_sizes[i]),
+                "experience_level": picks["experience_level"],
+                "vendor_relationships": picks["vendor_relationships"],
+                "technology_access": picks["technology_access"],
+                "emergency_budget": int(emergency_budgets[i])
+            }
+            
+            scenarios.append(self._assemble_scenario(
+                scenario_id=f"scenario_{scenario_ids[i]}",
+                event_type=self.EVENT_TYPES[event_idx[i]],
+                constraints=constraints,
+                complications=[self.COMPLICATIONS[c] for c in complication_idx[i]],
+                market_conditions=market_conditions,
+                available_resources=available_resources,
+                difficulty=difficulty,
+                category=category
+            ))
+        
+        return scenarios
+    
+    async def generate_scenarios_streaming(self, n: int, difficulty: DifficultyLevel,
+                                           category: AssessmentCategory,
+                                           concurrency: int = 10) -> AsyncIterator[AssessmentScenario]:
+        """Yield n scenarios one at a time, keeping at most `concurrency` in flight"""
+        pending = deque()
+        try:
+            for _ in range(n):
+                # Seeds are drawn here, in order, so each worker gets its own PRNG and
+                # a seeded generator streams the same scenarios however threads interleave
+                seed = self._rng.getrandbits(64)
+                pending.append(asyncio.ensure_future(
+                    asyncio.to_thread(self.generate_scenario, difficulty, category, seed)
+                ))
+                if len(pending) >= concurrency:
+                    yield await pending.popleft()
+            
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # Consumer stopped early: don't leave generation running in the background
+            for task in pending:
+                task.cancel()
+    
+    def _assemble_scenario(self, scenario_id: str, event_type: str, constraints: Dict[str, Any],
+                           complications: List[str], market_conditions: Dict[str, Any],
+                           available_resources: Dict[str, Any], difficulty: DifficultyLevel,
+                           category: AssessmentCategory) -> AssessmentScenario:
+        """Build a scenario from already drawn random picks"""
         
         # Base scenario context
         context = {
             "event_type": event_type,
             "constraints": constraints,
             "complications": complications,
-            "client_requirements": self._generate_client_requirements(event_type),
-            "market_conditions": self._generate_market_conditions(),
-            "available_resources": self._generate_available_resources()
+            "client_requirements": list(self._generate_client_requirements(event_type)),
+            "market_conditions": market_conditions,
+            "available_resources": available_resources
         }
         
-        # Generate decision points based on category
-        decision_points = self._generate_decision_points(category, context, difficulty)
-        
-        # Define success criteria
-        success_criteria = self._generate_success_criteria(category, constraints)
-        
-        # Provide resources
-        resources = self._generate_resources(category, difficulty)
-        
-        learning_objectives = self._generate_learning_objectives(category, difficulty)
+        # Decision points, success criteria, resources and learning objectives only
+        # depend on category/difficulty (plus the headline complication for crisis
+        # scenarios), so build them from the cached templates. Each scenario gets plain
+        # dict/list copies, so jsonify, asdict and callers' edits never see the frozen templates
+        crisis_complication = complications[0] if category == AssessmentCategory.CRISIS_MANAGEMENT else ""
+        decision_points, success_criteria, resources, learning_objectives = map(
+            _thaw, _scenario_template_parts(category, difficulty, crisis_complication)
+        )
         
         return AssessmentScenario(
             id=scenario_id,
@@ -195,252 +782,98 @@ class MockEventScenarioGenerator:
             resources_provided=resources
         )
     
-    def _select_constraints(self, difficulty: DifficultyLevel) -> Dict[str, Any]:
+    def _constraint_values(self, constraint: Dict[str, Any], difficulty: DifficultyLevel) -> List[Any]:
+        """Candidate values for a constraint at the given difficulty"""
+        if constraint["type"] == "budget" and difficulty == DifficultyLevel.BEGINNER:
+            # Higher budget for beginners
+            return constraint["values"][-3:]
+        if constraint["type"] == "timeline" and difficulty == DifficultyLevel.EXPERT:
+            # Shorter timeline for experts
+            return constraint["values"][:2]
+        return constraint["values"]
+    
+    def _select_constraints(self, rng: random.Random, difficulty: DifficultyLevel) -> Dict[str, Any]:
         """Select constraints based on difficulty"""
         constraints = {}
         
         # More constraints for higher difficulty
-        constraint_count = {
-            DifficultyLevel.BEGINNER: 2,
-            DifficultyLevel.INTERMEDIATE: 3,
-            DifficultyLevel.ADVANCED: 4,
-            DifficultyLevel.EXPERT: 5
-        }[difficulty]
-        
-        selected_constraints = random.sample(self.CONSTRAINTS, constraint_count)
+        selected_constraints = rng.sample(self.CONSTRAINTS, self.CONSTRAINT_COUNTS[difficulty])
         
         for constraint in selected_constraints:
-            if constraint["type"] == "budget" and difficulty == DifficultyLevel.BEGINNER:
-                # Higher budget for beginners
-                constraints[constraint["type"]] = random.choice(constraint["values"][-3:])
-            elif constraint["type"] == "timeline" and difficulty == DifficultyLevel.EXPERT:
-                # Shorter timeline for experts
-                constraints[constraint["type"]] = random.choice(constraint["values"][:2])
-            else:
-                constraints[constraint["type"]] = random.choice(constraint["values"])
+            constraints[constraint["type"]] = rng.choice(self._constraint_values(constraint, difficulty))
         
         return constraints
     
-    def _select_complications(self, difficulty: DifficultyLevel) -> List[str]:
+    def _select_complications(self, rng: random.Random, difficulty: DifficultyLevel) -> List[str]:
         """Select complications based on difficulty"""
-        complication_count = {
-            DifficultyLevel.BEGINNER: 1,
-            DifficultyLevel.INTERMEDIATE: 2,
-            DifficultyLevel.ADVANCED: 3,
-            DifficultyLevel.EXPERT: 4
-        }[difficulty]
-        
-        return random.sample(self.COMPLICATIONS, complication_count)
+        return rng.sample(self.COMPLICATIONS, self.COMPLICATION_COUNTS[difficulty])
     
-    def _generate_client_requirements(self, event_type: str) -> List[str]:
+    def _generate_client_requirements(self, event_type: str) -> Sequence[str]:
         """Generate realistic client requirements"""
-        base_requirements = [
-            "Professional photography/videography",
-            "High-quality catering",
-            "Reliable AV equipment",
-            "Comfortable seating arrangements",
-            "Easy parking access"
-        ]
-        
-        specific_requirements = {
-            "Corporate Conference": [
-                "Live streaming capability",
-                "Breakout session rooms",
-                "High-speed WiFi",
-                "Presentation equipment",
-                "Networking area"
-            ],
-            "Wedding Reception": [
-                "Dance floor",
-                "Romantic lighting",
-                "Wedding cake table",
-                "Photo booth area",
-                "Bridal suite access"
-            ],
-            "Music Festival": [
-                "Multiple stages",
-                "Sound system for 5000+ people",
-                "Security barriers",
-                "Food vendor space",
-                "Emergency medical station"
-            ]
-        }
-        
-        return base_requirements + specific_requirements.get(event_type, [])
+        return _CLIENT_REQUIREMENTS.get(event_type, _BASE_CLIENT_REQUIREMENTS)
     
-    def _generate_market_conditions(self) -> Dict[str, Any]:
+    def _generate_market_conditions(self, rng: random.Random) -> Dict[str, Any]:
         """Generate current market conditions"""
-        return {
-            "venue_availability": random.choice(["high", "medium", "low"]),
-            "vendor_pricing": random.choice(["competitive", "average", "premium"]),
-            "demand_level": random.choice(["low", "medium", "high"]),
-            "economic_climate": random.choice(["recession", "stable", "growth"]),
-            "seasonal_factors": random.choice(["peak_season", "off_season", "shoulder_season"])
-        }
+        return {key: rng.choice(options) for key, options in self.MARKET_CONDITION_OPTIONS.items()}
     
-    def _generate_available_resources(self) -> Dict[str, Any]:
+    def _generate_available_resources(self, rng: random.Random) -> Dict[str, Any]:
         """Generate available resources"""
         return {
-            "team_size": random.randint(2, 10),
-            "experience_level": random.choice(["junior", "mixed", "senior"]),
-            "vendor_relationships": random.choice(["new", "established", "premium"]),
-            "technology_access": random.choice(["basic", "standard", "advanced"]),
-            "emergency_budget": random.randint(1000, 10000)
+            "team_size": rng.randint(2, 10),
+            "experience_level": rng.choice(self.RESOURCE_OPTIONS["experience_level"]),
+            "vendor_relationships": rng.choice(self.RESOURCE_OPTIONS["vendor_relationships"]),
+            "technology_access": rng.choice(self.RESOURCE_OPTIONS["technology_access"]),
+            "emergency_budget": rng.randint(1000, 10000)
         }
     
-    def _generate_decision_points(self, category: AssessmentCategory, context: Dict, 
+    @staticmethod
+    def _generate_decision_points(category: AssessmentCategory, context: Dict, 
                                  difficulty: DifficultyLevel) -> List[Dict[str, Any]]:
         """Generate decision points based on category"""
         
-        decision_templates = {
-            AssessmentCategory.PLANNING: [
-                {
-                    "id": "venue_selection",
-                    "title": "Venue Selection",
-                    "description": "Choose the best venue option",
-                    "options": [
-                        {"id": "premium", "text": "Premium venue (+50% cost, best amenities)"},
-                        {"id": "standard", "text": "Standard venue (budget-friendly, adequate)"},
-                        {"id": "alternative", "text": "Non-traditional venue (unique, potential risks)"}
-                    ]
-                },
-                {
-                    "id": "catering_strategy",
-                    "title": "Catering Strategy",
-                    "description": "Select catering approach",
-                    "options": [
-                        {"id": "full_service", "text": "Full-service catering (highest cost, no hassle)"},
-                        {"id": "buffet", "text": "Buffet style (medium cost, efficient)"},
-                        {"id": "food_trucks", "text": "Multiple food trucks (trendy, coordination needed)"}
-                    ]
-                }
-            ],
-            AssessmentCategory.MARKETING: [
-                {
-                    "id": "marketing_channel",
-                    "title": "Primary Marketing Channel",
-                    "description": "Choose main marketing strategy",
-                    "options": [
-                        {"id": "social_media", "text": "Social media campaign (broad reach, cost-effective)"},
-                        {"id": "traditional", "text": "Traditional advertising (targeted, higher cost)"},
-                        {"id": "influencer", "text": "Influencer partnerships (trendy, variable ROI)"}
-                    ]
-                }
-            ],
-            AssessmentCategory.CRISIS_MANAGEMENT: [
-                {
-                    "id": "crisis_response",
-                    "title": "Crisis Response Strategy",
-                    "description": f"How do you handle: {context.get('complications', [''])[0]}",
-                    "options": [
-                        {"id": "immediate", "text": "Take immediate action (fast, potentially costly)"},
-                        {"id": "consult", "text": "Consult with team first (measured, might delay)"},
-                        {"id": "postpone", "text": "Consider postponing event (safe, disappointing)"}
-                    ]
-                }
-            ]
-        }
-        
         # Get base decisions for category
-        base_decisions = decision_templates.get(category, decision_templates[AssessmentCategory.PLANNING])
+        base_decisions = [
+            MappingProxyType(dict(template, description=template["description"].format(
+                complication=context.get('complications', [''])[0])))
+            if template["id"] == "crisis_response" else template
+            for template in _DECISION_TEMPLATES.get(category, _DECISION_TEMPLATES[AssessmentCategory.PLANNING])
+        ]
         
         # Add complexity based on difficulty
         if difficulty in [DifficultyLevel.ADVANCED, DifficultyLevel.EXPERT]:
-            base_decisions.extend([
-                {
-                    "id": "budget_reallocation",
-                    "title": "Budget Emergency",
-                    "description": "Budget cut by 25% - where do you reduce spending?",
-                    "options": [
-                        {"id": "venue", "text": "Downgrade venue (impacts experience)"},
-                        {"id": "catering", "text": "Reduce catering quality (attendee dissatisfaction)"},
-                        {"id": "marketing", "text": "Cut marketing budget (lower attendance)"}
-                    ]
-                }
-            ])
+            base_decisions.extend(_ADVANCED_DECISIONS)
         
         return base_decisions
     
-    def _generate_success_criteria(self, category: AssessmentCategory, constraints: Dict) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _generate_success_criteria(category: AssessmentCategory, constraints: Dict) -> List[Dict[str, Any]]:
         """Generate success criteria"""
-        base_criteria = [
-            {"metric": "budget_adherence", "target": 95, "weight": 0.3},
-            {"metric": "timeline_adherence", "target": 100, "weight": 0.2},
-            {"metric": "attendee_satisfaction", "target": 85, "weight": 0.3},
-            {"metric": "safety_compliance", "target": 100, "weight": 0.2}
-        ]
-        
-        category_specific = {
-            AssessmentCategory.MARKETING: [
-                {"metric": "registration_rate", "target": 80, "weight": 0.4}
-            ],
-            AssessmentCategory.SUSTAINABILITY: [
-                {"metric": "carbon_footprint_reduction", "target": 20, "weight": 0.3}
-            ]
-        }
-        
-        return base_criteria + category_specific.get(category, [])
+        return list(_BASE_CRITERIA + _CATEGORY_CRITERIA.get(category, ()))
     
-    def _generate_resources(self, category: AssessmentCategory, difficulty: DifficultyLevel) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _generate_resources(category: AssessmentCategory, difficulty: DifficultyLevel) -> Sequence[Dict[str, Any]]:
         """Generate available resources"""
-        base_resources = [
-            {"type": "document", "title": "Event Planning Checklist", "url": "/resources/checklist.pdf"},
-            {"type": "tool", "title": "Budget Calculator", "url": "/tools/budget-calc"},
-            {"type": "database", "title": "Vendor Directory", "url": "/vendors/search"}
-        ]
-        
         if difficulty in [DifficultyLevel.BEGINNER, DifficultyLevel.INTERMEDIATE]:
-            base_resources.extend([
-                {"type": "guide", "title": "Best Practices Guide", "url": "/guides/best-practices"},
-                {"type": "template", "title": "Timeline Template", "url": "/templates/timeline"}
-            ])
-        
-        return base_resources
+            return _GUIDED_RESOURCES
+        return _BASE_RESOURCES
     
-    def _generate_learning_objectives(self, category: AssessmentCategory, difficulty: DifficultyLevel) -> List[str]:
+    @staticmethod
+    def _generate_learning_objectives(category: AssessmentCategory, difficulty: DifficultyLevel) -> Sequence[str]:
         """Generate learning objectives"""
-        base_objectives = [
-            "Apply event planning fundamentals",
-            "Make data-driven decisions",
-            "Balance competing priorities",
-            "Manage stakeholder expectations"
-        ]
-        
-        category_objectives = {
-            AssessmentCategory.PLANNING: [
-                "Create comprehensive event timelines",
-                "Optimize resource allocation",
-                "Identify critical path dependencies"
-            ],
-            AssessmentCategory.MARKETING: [
-                "Design effective marketing campaigns",
-                "Calculate marketing ROI",
-                "Target appropriate audience segments"
-            ],
-            AssessmentCategory.CRISIS_MANAGEMENT: [
-                "Develop crisis response strategies",
-                "Communicate effectively under pressure",
-                "Minimize negative impact on event"
-            ]
-        }
-        
-        return base_objectives + category_objectives.get(category, [])
+        return _LEARNING_OBJECTIVES.get(category, _BASE_OBJECTIVES)
     
     def _generate_scenario_description(self, event_type: str, constraints: Dict, complications: List[str]) -> str:
         """Generate scenario description"""
-        description = f"You are tasked with planning a {event_type} with the following constraints:\n\n"
-        
-        for key, value in constraints.items():
-            description += f"• {key.title()}: {value}\n"
+        parts = [f"You are tasked with planning a {event_type} with the following constraints:\n\n"]
+        parts.extend(f"• {key.title()}: {value}\n" for key, value in constraints.items())
         
         if complications:
-            description += f"\nChallenges you must navigate:\n"
-            for complication in complications:
-                description += f"• {complication}\n"
+            parts.append("\nChallenges you must navigate:\n")
+            parts.extend(f"• {complication}\n" for complication in complications)
         
-        description += "\nMake strategic decisions to ensure event success while managing these constraints and challenges."
+        parts.append("\nMake strategic decisions to ensure event success while managing these constraints and challenges.")
         
-        return description
+        return "".join(parts)
     
     def _calculate_duration(self, difficulty: DifficultyLevel, decision_count: int) -> int:
         """Calculate estimated duration in minutes"""
@@ -453,13 +886,48 @@ class MockEventScenarioGenerator:
         
         return base_time * decision_count + 10  # 10 minutes for reading scenario
 
+# Feedback reference data is independent of the user and the request, so it is
+# loaded once per process and shared by every AIFeedbackEngine
+@functools.cache
+def _load_decision_patterns() -> Dict:
+    """Load decision pattern data"""
+    # In a real implementation, this would load from a database or ML model
+    return {}
+
+@functools.cache
+def _load_industry_benchmarks() -> Dict:
+    """Load industry benchmark data"""
+    # In a real implementation, this would load from industry data sources
+    return {}
+
+@functools.cache
+def _load_feedback_templates() -> Dict:
+    """Load feedback templates"""
+    # In a real implementation, this would load from configuration files
+    return {}
+
+@functools.lru_cache(maxsize=1024)
+def _scenario_template_parts(category: AssessmentCategory, difficulty: DifficultyLevel,
+                             crisis_complication: str) -> Tuple[tuple, tuple, tuple, tuple]:
+    """Scenario sections that depend only on category and difficulty, cached
+
+    Every part is a tuple of frozen entries; scenarios receive thawed copies (see _thaw).
+    """
+    context = {"complications": [crisis_complication]}
+    return (
+        tuple(MockEventScenarioGenerator._generate_decision_points(category, context, difficulty)),
+        tuple(MockEventScenarioGenerator._generate_success_criteria(category, {})),
+        MockEventScenarioGenerator._generate_resources(category, difficulty),
+        MockEventScenarioGenerator._generate_learning_objectives(category, difficulty)
+    )
+
 class AIFeedbackEngine:
     """AI-powered feedback system for assessments"""
     
     def __init__(self):
-        self.decision_patterns = self._load_decision_patterns()
-        self.industry_benchmarks = self._load_industry_benchmarks()
-        self.feedback_templates = self._load_feedback_templates()
+        self.decision_patterns = _load_decision_patterns()
+        self.industry_benchmarks = _load_industry_benchmarks()
+        self.feedback_templates = _load_feedback_templates()
     
     def analyze_decision(self, decision: UserDecision, scenario_context: Dict, 
                         decision_definition: Dict) -> DecisionFeedback:
@@ -497,6 +965,22 @@ class AIFeedbackEngine:
             consequences=consequences
         )
     
+    async def analyze_decisions(self, decisions: List[UserDecision], scenario_context: Dict,
+                                decision_definitions: Dict[str, Dict],
+                                max_concurrency: int = 10) -> List[DecisionFeedback]:
+        """Analyze decisions concurrently, preserving input order in the result"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _analyze_one(decision: UserDecision) -> DecisionFeedback:
+            async with semaphore:
+                # Run off the event loop so slow feedback sources don't block other tasks
+                return await asyncio.to_thread(
+                    self.analyze_decision, decision, scenario_context,
+                    decision_definitions[decision.decision_id]
+                )
+        
+        return list(await asyncio.gather(*(_analyze_one(d) for d in decisions)))
+    
     def _assess_decision_impact(self, decision: UserDecision, scenario_context: Dict, 
                                decision_definition: Dict) -> DecisionImpact:
         """Assess the impact of a decision"""
@@ -508,168 +992,24 @@ class AIFeedbackEngine:
         if not chosen_option:
             return DecisionImpact.NEUTRAL
         
-        # Analyze decision based on scenario context
-        constraints = scenario_context.get("constraints", {})
-        complications = scenario_context.get("complications", [])
-        
-        # Decision-specific logic
-        if decision_definition["id"] == "venue_selection":
-            return self._analyze_venue_decision(decision.choice_made, constraints)
-        elif decision_definition["id"] == "catering_strategy":
-            return self._analyze_catering_decision(decision.choice_made, constraints)
-        elif decision_definition["id"] == "marketing_channel":
-            return self._analyze_marketing_decision(decision.choice_made, constraints)
-        elif decision_definition["id"] == "crisis_response":
-            return self._analyze_crisis_decision(decision.choice_made, complications)
-        elif decision_definition["id"] == "budget_reallocation":
-            return self._analyze_budget_decision(decision.choice_made, constraints)
-        
-        return DecisionImpact.NEUTRAL
-    
-    def _analyze_venue_decision(self, choice: str, constraints: Dict) -> DecisionImpact:
-        """Analyze venue selection decision"""
-        budget = constraints.get("budget", 50000)
-        attendees = constraints.get("attendees", 300)
-        
-        if choice == "premium":
-            if budget > 100000:
-                return DecisionImpact.MAJOR_POSITIVE  # Can afford it
-            elif attendees > 500:
-                return DecisionImpact.MINOR_POSITIVE  # Worth it for large events
-            else:
-                return DecisionImpact.MINOR_NEGATIVE  # Overspending
-        
-        elif choice == "standard":
-            return DecisionImpact.MINOR_POSITIVE  # Safe choice
-        
-        elif choice == "alternative":
-            if attendees < 200:
-                return DecisionImpact.MAJOR_POSITIVE  # Creative for small events
-            else:
-                return DecisionImpact.MINOR_NEGATIVE  # Risky for large events
-        
-        return DecisionImpact.NEUTRAL
-    
-    def _analyze_catering_decision(self, choice: str, constraints: Dict) -> DecisionImpact:
-        """Analyze catering strategy decision"""
-        budget = constraints.get("budget", 50000)
-        attendees = constraints.get("attendees", 300)
-        
-        cost_per_person = budget / attendees if attendees > 0 else 0
-        
-        if choice == "full_service":
-            if cost_per_person > 100:
-                return DecisionImpact.MAJOR_POSITIVE  # Can afford premium
-            else:
-                return DecisionImpact.MAJOR_NEGATIVE  # Budget strain
-        
-        elif choice == "buffet":
-            return DecisionImpact.MINOR_POSITIVE  # Balanced choice
-        
-        elif choice == "food_trucks":
-            if attendees < 500:
-                return DecisionImpact.MAJOR_POSITIVE  # Trendy and manageable
-            else:
-                return DecisionImpact.MINOR_NEGATIVE  # Coordination challenges
-        
-        return DecisionImpact.NEUTRAL
-    
-    def _analyze_marketing_decision(self, choice: str, constraints: Dict) -> DecisionImpact:
-        """Analyze marketing channel decision"""
-        budget = constraints.get("budget", 50000)
-        attendees = constraints.get("attendees", 300)
-        
-        marketing_budget = budget * 0.15  # Assume 15% marketing budget
-        
-        if choice == "social_media":
-            if attendees < 1000:
-                return DecisionImpact.MAJOR_POSITIVE  # Cost-effective for smaller events
-            else:
-                return DecisionImpact.MINOR_POSITIVE  # Good reach
-        
-        elif choice == "traditional":
-            if marketing_budget > 5000:
-                return DecisionImpact.MINOR_POSITIVE  # Can afford it
-            else:
-                return DecisionImpact.MINOR_NEGATIVE  # Expensive
-        
-        elif choice == "influencer":
-            if attendees < 500:
-                return DecisionImpact.MINOR_NEGATIVE  # Limited reach for small events
-            else:
-                return DecisionImpact.MINOR_POSITIVE  # Good for large events
-        
-        return DecisionImpact.NEUTRAL
-    
-    def _analyze_crisis_decision(self, choice: str, complications: List[str]) -> DecisionImpact:
-        """Analyze crisis management decision"""
-        # More complex decisions get better results for immediate action
-        severity = len(complications)
-        
-        if choice == "immediate":
-            if severity > 2:
-                return DecisionImpact.MAJOR_POSITIVE  # Quick action needed
-            else:
-                return DecisionImpact.MINOR_POSITIVE  # Proactive
-        
-        elif choice == "consult":
-            if severity <= 2:
-                return DecisionImpact.MINOR_POSITIVE  # Good for minor issues
-            else:
-                return DecisionImpact.MINOR_NEGATIVE  # Delays in crisis
-        
-        elif choice == "postpone":
-            if severity > 3:
-                return DecisionImpact.MINOR_POSITIVE  # Sometimes necessary
-            else:
-                return DecisionImpact.MAJOR_NEGATIVE  # Unnecessary cancellation
-        
-        return DecisionImpact.NEUTRAL
-    
-    def _analyze_budget_decision(self, choice: str, constraints: Dict) -> DecisionImpact:
-        """Analyze budget reallocation decision"""
-        event_type = constraints.get("event_type", "Corporate Conference")
-        
-        # Different events prioritize different aspects
-        if event_type in ["Wedding Reception", "Charity Gala"]:
-            if choice == "marketing":
-                return DecisionImpact.MAJOR_POSITIVE  # Less marketing needed
-            elif choice == "venue":
-                return DecisionImpact.MAJOR_NEGATIVE  # Venue is critical
-        
-        elif event_type in ["Corporate Conference", "Product Launch"]:
-            if choice == "catering":
-                return DecisionImpact.MINOR_POSITIVE  # Can manage with simpler food
-            elif choice == "marketing":
-                return DecisionImpact.MINOR_NEGATIVE  # Marketing important for corporate
-        
-        return DecisionImpact.MINOR_NEGATIVE  # Budget cuts always have some impact
+        # Decision-specific rules, evaluated against the relevant part of the scenario
+        return _apply_rules(decision_definition["id"], decision.choice_made, scenario_context)
     
     def _calculate_decision_score(self, decision: UserDecision, impact: DecisionImpact, 
                                  scenario_context: Dict) -> float:
         """Calculate numeric score for decision"""
         
-        # Base scores for different impact levels
-        impact_scores = {
-            DecisionImpact.CRITICAL_SUCCESS: 95,
-            DecisionImpact.MAJOR_POSITIVE: 85,
-            DecisionImpact.MINOR_POSITIVE: 75,
-            DecisionImpact.NEUTRAL: 60,
-            DecisionImpact.MINOR_NEGATIVE: 45,
-            DecisionImpact.MAJOR_NEGATIVE: 30,
-            DecisionImpact.CRITICAL_FAILURE: 15
-        }
-        
-        base_score = impact_scores[impact]
+        # Base score for the impact level
+        base_score = _IMPACT_SCORES[impact]
         
         # Adjust for decision time (faster decisions get slight bonus)
         time_bonus = max(0, 5 - (decision.time_taken / 30))  # 30 seconds = 0 bonus
         
         # Adjust for confidence (higher confidence with good decisions gets bonus)
         confidence_modifier = 0
-        if impact in [DecisionImpact.MAJOR_POSITIVE, DecisionImpact.CRITICAL_SUCCESS]:
+        if impact in _POSITIVE_IMPACTS:
             confidence_modifier = (decision.confidence_level - 0.5) * 10
-        elif impact in [DecisionImpact.MAJOR_NEGATIVE, DecisionImpact.CRITICAL_FAILURE]:
+        elif impact in _SEVERE_NEGATIVE_IMPACTS:
             confidence_modifier = (0.5 - decision.confidence_level) * 10
         
         # Rationale bonus
@@ -680,95 +1020,27 @@ class AIFeedbackEngine:
     
     def _generate_feedback_text(self, decision: UserDecision, impact: DecisionImpact, score: float) -> str:
         """Generate personalized feedback text"""
-        
-        impact_messages = {
-            DecisionImpact.CRITICAL_SUCCESS: "Excellent decision! This choice demonstrates exceptional event management skills.",
-            DecisionImpact.MAJOR_POSITIVE: "Great choice! This decision shows strong understanding of event planning principles.",
-            DecisionImpact.MINOR_POSITIVE: "Good decision. This choice addresses the key requirements effectively.",
-            DecisionImpact.NEUTRAL: "Reasonable choice. This decision is acceptable but may have missed optimization opportunities.",
-            DecisionImpact.MINOR_NEGATIVE: "This choice has some drawbacks. Consider the potential consequences more carefully.",
-            DecisionImpact.MAJOR_NEGATIVE: "This decision could create significant challenges for your event.",
-            DecisionImpact.CRITICAL_FAILURE: "This choice could jeopardize the entire event. Reconsider your approach."
-        }
-        
-        base_feedback = impact_messages[impact]
-        
-        # Add score-specific commentary
-        if score >= 90:
-            base_feedback += " Your score reflects mastery-level decision making."
-        elif score >= 80:
-            base_feedback += " Your score shows strong competency in this area."
-        elif score >= 70:
-            base_feedback += " Your score indicates good understanding with room for improvement."
-        elif score >= 60:
-            base_feedback += " Your score suggests you grasp the basics but need more practice."
-        else:
-            base_feedback += " Your score indicates this is an area requiring significant development."
-        
-        # Add rationale feedback if provided
-        if decision.rationale:
-            if len(decision.rationale) > 100:
-                base_feedback += " Your detailed rationale shows thoughtful consideration of the decision."
-            elif len(decision.rationale) > 50:
-                base_feedback += " Good job providing rationale for your decision."
-            else:
-                base_feedback += " Try to provide more detailed rationale to demonstrate your thinking process."
-        else:
-            base_feedback += " Consider providing rationale for your decisions to show your thought process."
-        
-        return base_feedback
+        return _FEEDBACK_GRID[impact][_score_bucket(score)][_rationale_bucket(decision.rationale)]
     
     def _generate_improvement_suggestions(self, decision: UserDecision, impact: DecisionImpact, 
                                         decision_definition: Dict) -> List[str]:
         """Generate improvement suggestions"""
         suggestions = []
         
-        if impact in [DecisionImpact.MINOR_NEGATIVE, DecisionImpact.MAJOR_NEGATIVE, DecisionImpact.CRITICAL_FAILURE]:
-            decision_id = decision_definition["id"]
-            
-            if decision_id == "venue_selection":
-                suggestions.extend([
-                    "Consider venue capacity relative to expected attendance",
-                    "Factor in accessibility requirements for all attendees",
-                    "Evaluate venue's technical capabilities for your event needs",
-                    "Review venue's track record and references from similar events"
-                ])
-            
-            elif decision_id == "catering_strategy":
-                suggestions.extend([
-                    "Consider dietary restrictions and preferences of your audience",
-                    "Factor in service timing and logistics for meal service",
-                    "Evaluate catering quality vs. budget trade-offs",
-                    "Plan for contingencies like last-minute attendance changes"
-                ])
-            
-            elif decision_id == "marketing_channel":
-                suggestions.extend([
-                    "Analyze your target audience's media consumption habits",
-                    "Calculate expected return on investment for each channel",
-                    "Consider integrated marketing approaches vs. single channels",
-                    "Test marketing messages before full campaign launch"
-                ])
-            
-            elif decision_id == "crisis_response":
-                suggestions.extend([
-                    "Develop crisis communication protocols in advance",
-                    "Create decision trees for common crisis scenarios",
-                    "Establish clear escalation procedures",
-                    "Practice crisis response through scenario planning"
-                ])
-        
-        # General suggestions
-        if decision.time_taken > 180:  # More than 3 minutes
+        if impact in _NEGATIVE_IMPACTS:
+            suggestions.extend(_IMPROVEMENT_SUGGESTIONS.get(decision_definition["id"], ()))
+        
+        # General suggestions, until the top 5 are filled
+        if decision.time_taken > 180 and len(suggestions) < 5:  # More than 3 minutes
             suggestions.append("Practice making decisions more quickly under time pressure")
         
-        if decision.confidence_level < 0.6:
+        if decision.confidence_level < 0.6 and len(suggestions) < 5:
             suggestions.append("Build confidence through additional scenario practice")
         
-        if not decision.rationale:
+        if not decision.rationale and len(suggestions) < 5:
             suggestions.append("Always document your decision rationale for future reference")
         
-        return suggestions[:5]  # Return top 5 suggestions
+        return suggestions
     
     def _generate_alternatives(self, decision: UserDecision, decision_definition: Dict) -> List[str]:
         """Generate alternative approaches"""
@@ -784,129 +1056,95 @@ class AIFeedbackEngine:
     
     def _get_option_analysis(self, option_id: str, decision_id: str) -> str:
         """Get analysis for an option"""
-        analyses = {
-            "venue_selection": {
-                "premium": "Higher cost but superior attendee experience and fewer logistical issues",
-                "standard": "Balanced approach with predictable outcomes and manageable costs",
-                "alternative": "Creative differentiation but requires more planning and risk management"
-            },
-            "catering_strategy": {
-                "full_service": "Highest attendee satisfaction but premium pricing",
-                "buffet": "Cost-effective with good variety but requires space planning",
-                "food_trucks": "Unique experience with Instagram-worthy moments but coordination complexity"
-            },
-            "marketing_channel": {
-                "social_media": "Cost-effective reach with engagement metrics and targeting options",
-                "traditional": "Professional credibility with established audience reach",
-                "influencer": "Authentic endorsements with potential viral reach but variable reliability"
-            }
-        }
-        
-        return analyses.get(decision_id, {}).get(option_id, "Alternative approach with different trade-offs")
+        return _OPTION_ANALYSES.get(decision_id, _NO_ANALYSES).get(option_id, _DEFAULT_OPTION_ANALYSIS)
     
-    def _get_best_practices(self, decision_id: str) -> List[str]:
+    def _get_best_practices(self, decision_id: str) -> Sequence[str]:
         """Get industry best practices for decision type"""
-        practices = {
-            "venue_selection": [
-                "Visit venues in person before making final decisions",
-                "Review contracts carefully for hidden fees and restrictions",
-                "Confirm backup plans for outdoor venues",
-                "Verify insurance requirements and liability coverage"
-            ],
-            "catering_strategy": [
-                "Conduct tasting sessions before finalizing menus",
-                "Plan for 10-15% more food than confirmed attendees",
-                "Accommodate dietary restrictions and cultural preferences",
-                "Coordinate catering timeline with event schedule"
-            ],
-            "marketing_channel": [
-                "Start marketing campaigns 6-8 weeks before event",
-                "Create compelling calls-to-action with clear value propositions",
-                "Track conversion metrics and adjust strategies accordingly",
-                "Leverage early bird pricing to drive initial momentum"
-            ],
-            "crisis_response": [
-                "Communicate transparently with stakeholders about issues",
-                "Have contingency plans prepared for common problems",
-                "Document all crisis decisions for post-event analysis",
-                "Follow up with affected parties to maintain relationships"
-            ]
-        }
-        
-        return practices.get(decision_id, [
-            "Research thoroughly before making decisions",
-            "Consider long-term implications of choices",
-            "Get input from experienced team members",
-            "Document decisions for future reference"
-        ])
+        return _BEST_PRACTICES.get(decision_id, _GENERAL_BEST_PRACTICES)
     
     def _calculate_consequences(self, decision: UserDecision, impact: DecisionImpact, 
                                scenario_context: Dict) -> Dict[str, Any]:
         """Calculate decision consequences"""
-        consequences = {
-            "budget_impact": 0,
-            "timeline_impact": 0,
-            "attendee_satisfaction": 0,
-            "risk_level": "medium",
-            "reputation_impact": 0
-        }
+        consequences = dict(_CONSEQUENCE_BASE)
         
         # Impact-based consequences
-        if impact == DecisionImpact.CRITICAL_SUCCESS:
-            consequences.update({
-                "budget_impact": 5,  # Positive impact
-                "attendee_satisfaction": 20,
-                "risk_level": "low",
-                "reputation_impact": 15
-            })
-        elif impact == DecisionImpact.MAJOR_POSITIVE:
-            consequences.update({
-                "budget_impact": 2,
-                "attendee_satisfaction": 10,
-                "risk_level": "low",
-                "reputation_impact": 8
-            })
-        elif impact == DecisionImpact.MAJOR_NEGATIVE:
-            consequences.update({
-                "budget_impact": -15,
-                "timeline_impact": -5,
-                "attendee_satisfaction": -15,
-                "risk_level": "high",
-                "reputation_impact": -10
-            })
-        elif impact == DecisionImpact.CRITICAL_FAILURE:
-            consequences.update({
-                "budget_impact": -25,
-                "timeline_impact": -10,
-                "attendee_satisfaction": -25,
-                "risk_level": "critical",
-                "reputation_impact": -20
-            })
+        overrides = _CONSEQUENCES_BY_IMPACT.get(impact)
+        if overrides:
+            consequences.update(overrides)
         
         return consequences
+
+_feedback_engine = None
+
+def get_feedback_engine() -> AIFeedbackEngine:
+    """Return the process-wide feedback engine, creating it on first use"""
+    global _feedback_engine
+    if _feedback_engine is None:
+        _feedback_engine = AIFeedbackEngine()
+    return _feedback_engine
+
+# Per-process sequence appended to assessment ids so ids created in the same
+# clock tick never collide
+_ASSESSMENT_IDS = itertools.count()
+
+# Score categories and the decision id keywords that count towards each
+_CATEGORY_KEYWORDS = (
+    ("planning", ("venue", "catering", "timeline")),
+    ("marketing", ("marketing",)),
+    ("crisis_management", ("crisis",)),
+    ("budget_management", ("budget",))
+)
+
+# Next difficulty up/down for recommendations (the top and bottom levels have none)
+_HARDER = MappingProxyType({
+    DifficultyLevel.BEGINNER: DifficultyLevel.INTERMEDIATE,
+    DifficultyLevel.INTERMEDIATE: DifficultyLevel.ADVANCED,
+    DifficultyLevel.ADVANCED: DifficultyLevel.EXPERT
+})
+
+_EASIER = MappingProxyType({
+    DifficultyLevel.EXPERT: DifficultyLevel.ADVANCED,
+    DifficultyLevel.ADVANCED: DifficultyLevel.INTERMEDIATE,
+    DifficultyLevel.INTERMEDIATE: DifficultyLevel.BEGINNER
+})
+
+# The first two other categories, suggested after a strong result
+_OTHER_CATEGORIES = MappingProxyType({
+    category: tuple(other for other in AssessmentCategory if other != category)[:2]
+    for category in AssessmentCategory
+})
+
+# Improvement areas for low-scoring decisions, by decision id keyword (first match wins)
+_AREA_KEYWORDS = (
+    ("venue", "Venue Selection Strategy"),
+    ("catering", "Catering Management"),
+    ("marketing", "Marketing Strategy"),
+    ("crisis", "Crisis Management"),
+    ("budget", "Budget Management")
+)
+
+@dataclass(slots=True)
+class _ActiveSession:
+    """An in-progress assessment with its scenario, decision id index and running score"""
+    assessment: AssessmentResult
+    scenario: AssessmentScenario
+    decision_index: Dict[str, Dict[str, Any]]
+    # Running totals over feedback scores, kept up to date by AssessmentManager.submit_decision
+    score_sum: float = 0.0
+    score_count: int = 0
     
-    def _load_decision_patterns(self) -> Dict:
-        """Load decision pattern data"""
-        # In a real implementation, this would load from a database or ML model
-        return {}
-    
-    def _load_industry_benchmarks(self) -> Dict:
-        """Load industry benchmark data"""
-        # In a real implementation, this would load from industry data sources
-        return {}
-    
-    def _load_feedback_templates(self) -> Dict:
-        """Load feedback templates"""
-        # In a real implementation, this would load from configuration files
-        return {}
+    @property
+    def average_score(self) -> float:
+        """Mean feedback score so far (0 before the first decision)"""
+        return self.score_sum / self.score_count if self.score_count else 0
 
 class AssessmentManager:
     """Main assessment management system"""
     
     def __init__(self):
         self.scenario_generator = MockEventScenarioGenerator()
-        self.feedback_engine = AIFeedbackEngine()
-        self.active_assessments = {}  # user_id -> assessment_result
+        self.feedback_engine = get_feedback_engine()
+        self.active_assessments: Dict[int, _ActiveSession] = {}
     
     def create_assessment(self, user_id: int, assessment_type: AssessmentType, 
                          difficulty: DifficultyLevel, category: AssessmentCategory) -> str:
@@ -916,7 +1154,7 @@ class AssessmentManager:
         scenario = self.scenario_generator.generate_scenario(difficulty, category)
         
         # Create assessment result
-        assessment_id = f"assessment_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        assessment_id = f"assessment_{user_id}_{time.time_ns()}_{next(_ASSESSMENT_IDS)}"
         
         assessment_result = AssessmentResult(
             assessment_id=assessment_id,
@@ -935,29 +1173,26 @@ class AssessmentManager:
         )
         
         # Store active assessment
-        self.active_assessments[user_id] = {
-            'assessment': assessment_result,
-            'scenario': scenario
-        }
+        self.active_assessments[user_id] = _ActiveSession(
+            assessment=assessment_result,
+            scenario=scenario,
+            decision_index={dp["id"]: dp for dp in scenario.decision_points}
+        )
         
         return assessment_id
     
     def submit_decision(self, user_id: int, decision: UserDecision) -> DecisionFeedback:
         """Submit a user decision and get immediate feedback"""
         
-        if user_id not in self.active_assessments:
+        active = self.active_assessments.get(user_id)
+        if active is None:
             raise ValueError("No active assessment found for user")
         
-        active = self.active_assessments[user_id]
-        assessment = active['assessment']
-        scenario = active['scenario']
+        assessment = active.assessment
+        scenario = active.scenario
         
         # Find decision definition
-        decision_def = None
-        for dp in scenario.decision_points:
-            if dp["id"] == decision.decision_id:
-                decision_def = dp
-                break
+        decision_def = active.decision_index.get(decision.decision_id)
         
         if not decision_def:
             raise ValueError("Invalid decision ID")
@@ -970,25 +1205,27 @@ class AssessmentManager:
         # Store decision and feedback
         assessment.decisions.append(decision)
         assessment.feedback.append(feedback)
+        active.score_sum += feedback.score
+        active.score_count += 1
         
         return feedback
     
     def complete_assessment(self, user_id: int) -> AssessmentResult:
         """Complete an assessment and calculate final results"""
         
-        if user_id not in self.active_assessments:
+        active = self.active_assessments.get(user_id)
+        if active is None:
             raise ValueError("No active assessment found for user")
         
-        active = self.active_assessments[user_id]
-        assessment = active['assessment']
-        scenario = active['scenario']
+        assessment = active.assessment
+        scenario = active.scenario
         
         # Set completion time
         assessment.completion_time = datetime.utcnow()
         
         # Calculate overall score
-        if assessment.feedback:
-            assessment.overall_score = sum(f.score for f in assessment.feedback) / len(assessment.feedback)
+        if active.score_count:
+            assessment.overall_score = active.average_score
         
         # Calculate category scores
         assessment.category_scores = self._calculate_category_scores(assessment, scenario)
@@ -1016,15 +1253,16 @@ class AssessmentManager:
     def get_assessment_progress(self, user_id: int) -> Dict[str, Any]:
         """Get progress of current assessment"""
         
-        if user_id not in self.active_assessments:
+        active = self.active_assessments.get(user_id)
+        if active is None:
             return {"error": "No active assessment"}
         
-        active = self.active_assessments[user_id]
-        assessment = active['assessment']
-        scenario = active['scenario']
+        assessment = active.assessment
+        scenario = active.scenario
         
         total_decisions = len(scenario.decision_points)
         completed_decisions = len(assessment.decisions)
+        elapsed = (datetime.utcnow() - assessment.start_time).total_seconds() / 60  # minutes
         
         return {
             "assessment_id": assessment.assessment_id,
@@ -1032,40 +1270,33 @@ class AssessmentManager:
             "progress_percentage": (completed_decisions / total_decisions) * 100,
             "completed_decisions": completed_decisions,
             "total_decisions": total_decisions,
-            "current_score": sum(f.score for f in assessment.feedback) / len(assessment.feedback) if assessment.feedback else 0,
-            "time_elapsed": (datetime.utcnow() - assessment.start_time).total_seconds() / 60,  # minutes
-            "estimated_remaining": max(0, scenario.estimated_duration - ((datetime.utcnow() - assessment.start_time).total_seconds() / 60))
+            "current_score": active.average_score,
+            "time_elapsed": elapsed,
+            "estimated_remaining": max(0, scenario.estimated_duration - elapsed)
         }
     
     def get_scenario(self, user_id: int) -> Optional[AssessmentScenario]:
         """Get current scenario for user"""
         
-        if user_id not in self.active_assessments:
-            return None
-        
-        return self.active_assessments[user_id]['scenario']
+        active = self.active_assessments.get(user_id)
+        return active.scenario if active is not None else None
     
     def _calculate_category_scores(self, assessment: AssessmentResult, scenario: AssessmentScenario) -> Dict[str, float]:
         """Calculate scores by category"""
-        category_scores = {}
-        
-        if assessment.feedback:
-            # Group feedback by decision category (simplified)
-            planning_scores = [f.score for f in assessment.feedback if any(kw in f.decision_id for kw in ['venue', 'catering', 'timeline'])]
-            marketing_scores = [f.score for f in assessment.feedback if 'marketing' in f.decision_id]
-            crisis_scores = [f.score for f in assessment.feedback if 'crisis' in f.decision_id]
-            budget_scores = [f.score for f in assessment.feedback if 'budget' in f.decision_id]
-            
-            if planning_scores:
-                category_scores['planning'] = sum(planning_scores) / len(planning_scores)
-            if marketing_scores:
-                category_scores['marketing'] = sum(marketing_scores) / len(marketing_scores)
-            if crisis_scores:
-                category_scores['crisis_management'] = sum(crisis_scores) / len(crisis_scores)
-            if budget_scores:
-                category_scores['budget_management'] = sum(budget_scores) / len(budget_scores)
-        
-        return category_scores
+        # Group feedback by decision category (simplified) in a single pass
+        sums = [0.0] * len(_CATEGORY_KEYWORDS)
+        counts = [0] * len(_CATEGORY_KEYWORDS)
+        for f in assessment.feedback:
+            for i, (_, keywords) in enumerate(_CATEGORY_KEYWORDS):
+                if any(kw in f.decision_id for kw in keywords):
+                    sums[i] += f.score
+                    counts[i] += 1
+        
+        return {
+            category: sums[i] / counts[i]
+            for i, (category, _) in enumerate(_CATEGORY_KEYWORDS)
+            if counts[i]
+        }
     
     def _determine_achievements(self, assessment: AssessmentResult, scenario: AssessmentScenario) -> List[str]:
         """Determine achievements earned"""
@@ -1085,41 +1316,32 @@ class AssessmentManager:
             achievements.append("Speed Demon")
         
         # Decision quality achievements
-        excellent_decisions = [f for f in assessment.feedback if f.impact_assessment in [DecisionImpact.CRITICAL_SUCCESS, DecisionImpact.MAJOR_POSITIVE]]
-        if len(excellent_decisions) == len(assessment.feedback):
+        excellent_decisions = sum(1 for f in assessment.feedback if f.impact_assessment in _POSITIVE_IMPACTS)
+        if excellent_decisions == len(assessment.feedback):
             achievements.append("Decision Master")
         
         # Rationale achievements
-        detailed_rationales = [d for d in assessment.decisions if d.rationale and len(d.rationale) > 100]
-        if len(detailed_rationales) >= len(assessment.decisions) * 0.8:
+        detailed_rationales = sum(1 for d in assessment.decisions if d.rationale and len(d.rationale) > 100)
+        if detailed_rationales >= len(assessment.decisions) * 0.8:
             achievements.append("Thoughtful Planner")
         
         return achievements
     
     def _identify_improvement_areas(self, assessment: AssessmentResult) -> List[str]:
         """Identify areas needing improvement"""
-        areas = []
-        
-        # Find lowest-scoring feedback
-        if assessment.feedback:
-            low_score_feedback = [f for f in assessment.feedback if f.score < 70]
-            
-            for feedback in low_score_feedback:
-                if 'venue' in feedback.decision_id:
-                    areas.append("Venue Selection Strategy")
-                elif 'catering' in feedback.decision_id:
-                    areas.append("Catering Management")
-                elif 'marketing' in feedback.decision_id:
-                    areas.append("Marketing Strategy")
-                elif 'crisis' in feedback.decision_id:
-                    areas.append("Crisis Management")
-                elif 'budget' in feedback.decision_id:
-                    areas.append("Budget Management")
-        
-        # Remove duplicates and limit to top 5
-        areas = list(set(areas))[:5]
-        
-        return areas
+        areas = set()
+        
+        # Classify each low-scoring decision by the first matching keyword
+        for feedback in assessment.feedback:
+            if feedback.score >= 70:
+                continue
+            for keyword, area in _AREA_KEYWORDS:
+                if keyword in feedback.decision_id:
+                    areas.add(area)
+                    break
+        
+        # Limit to top 5
+        return list(areas)[:5]
     
     def _recommend_next_assessments(self, assessment: AssessmentResult, scenario: AssessmentScenario) -> List[str]:
         """Recommend next assessments based on performance"""
@@ -1130,28 +1352,17 @@ class AssessmentManager:
         
         # If performed well, suggest harder difficulty or different category
         if assessment.overall_score >= 85:
-            if current_difficulty != DifficultyLevel.EXPERT:
-                next_difficulty = {
-                    DifficultyLevel.BEGINNER: DifficultyLevel.INTERMEDIATE,
-                    DifficultyLevel.INTERMEDIATE: DifficultyLevel.ADVANCED,
-                    DifficultyLevel.ADVANCED: DifficultyLevel.EXPERT
-                }[current_difficulty]
-                recommendations.append(f"{current_category.value.title()} - {next_difficulty.value.title()}")
+            if current_difficulty in _HARDER:
+                recommendations.append(f"{current_category.value.title()} - {_HARDER[current_difficulty].value.title()}")
             
             # Suggest different categories
-            other_categories = [cat for cat in AssessmentCategory if cat != current_category][:2]
-            for cat in other_categories:
+            for cat in _OTHER_CATEGORIES[current_category]:
                 recommendations.append(f"{cat.value.title()} - {current_difficulty.value.title()}")
         
         # If performed poorly, suggest similar difficulty or easier
         elif assessment.overall_score < 70:
-            if current_difficulty != DifficultyLevel.BEGINNER:
-                easier_difficulty = {
-                    DifficultyLevel.EXPERT: DifficultyLevel.ADVANCED,
-                    DifficultyLevel.ADVANCED: DifficultyLevel.INTERMEDIATE,
-                    DifficultyLevel.INTERMEDIATE: DifficultyLevel.BEGINNER
-                }[current_difficulty]
-                recommendations.append(f"{current_category.value.title()} - {easier_difficulty.value.title()}")
+            if current_difficulty in _EASIER:
+                recommendations.append(f"{current_category.value.title()} - {_EASIER[current_difficulty].value.title()}")
             
             # Suggest practice in same category
             recommendations.append(f"{current_category.value.title()} - Practice Session")
@@ -1167,46 +1378,46 @@ class AssessmentManager:
     def _generate_real_world_application(self, assessment: AssessmentResult, scenario: AssessmentScenario) -> str:
         """Generate real-world application advice"""
         
-        application = f"Based on your {scenario.title} assessment, here's how to apply these skills in real-world event planning:\n\n"
+        parts = [f"Based on your {scenario.title} assessment, here's how to apply these skills in real-world event planning:\n\n"]
         
         # High performers get advanced advice
         if assessment.overall_score >= 85:
-            application += "You demonstrated strong event management capabilities. Focus on:\n"
-            application += "• Leading larger, more complex events\n"
-            application += "• Mentoring junior event planners\n"
-            application += "• Developing innovative event concepts\n"
-            application += "• Building strategic vendor partnerships\n"
+            parts.append("You demonstrated strong event management capabilities. Focus on:\n")
+            parts.append("• Leading larger, more complex events\n")
+            parts.append("• Mentoring junior event planners\n")
+            parts.append("• Developing innovative event concepts\n")
+            parts.append("• Building strategic vendor partnerships\n")
         
         # Medium performers get practical advice
         elif assessment.overall_score >= 70:
-            application += "You show good fundamental understanding. To improve:\n"
-            application += "• Practice decision-making under time pressure\n"
-            application += "• Shadow experienced event planners\n"
-            application += "• Join professional event planning associations\n"
-            application += "• Take on progressively challenging events\n"
+            parts.append("You show good fundamental understanding. To improve:\n")
+            parts.append("• Practice decision-making under time pressure\n")
+            parts.append("• Shadow experienced event planners\n")
+            parts.append("• Join professional event planning associations\n")
+            parts.append("• Take on progressively challenging events\n")
         
         # Lower performers get foundational advice
         else:
-            application += "Focus on building strong foundations:\n"
-            application += "• Study event planning fundamentals\n"
-            application += "• Start with smaller, simpler events\n"
-            application += "• Work closely with mentors\n"
-            application += "• Practice with mock scenarios regularly\n"
+            parts.append("Focus on building strong foundations:\n")
+            parts.append("• Study event planning fundamentals\n")
+            parts.append("• Start with smaller, simpler events\n")
+            parts.append("• Work closely with mentors\n")
+            parts.append("• Practice with mock scenarios regularly\n")
         
         # Add category-specific advice
         if scenario.category == AssessmentCategory.PLANNING:
-            application += "\nFor event planning specifically:\n"
-            application += "• Create detailed project timelines\n"
-            application += "• Build comprehensive vendor databases\n"
-            application += "• Develop contingency plans for all major components\n"
+            parts.append("\nFor event planning specifically:\n")
+            parts.append("• Create detailed project timelines\n")
+            parts.append("• Build comprehensive vendor databases\n")
+            parts.append("• Develop contingency plans for all major components\n")
         
         elif scenario.category == AssessmentCategory.MARKETING:
-            application += "\nFor event marketing specifically:\n"
-            application += "• Study your target audience demographics\n"
-            application += "• Test marketing messages before full campaigns\n"
-            application += "• Track and analyze campaign performance metrics\n"
+            parts.append("\nFor event marketing specifically:\n")
+            parts.append("• Study your target audience demographics\n")
+            parts.append("• Test marketing messages before full campaigns\n")
+            parts.append("• Track and analyze campaign performance metrics\n")
         
-        return application
+        return "".join(parts)
     
     def _store_assessment_result(self, assessment: AssessmentResult):
         """Store assessment result in database"""
@@ -1221,6 +1432,27 @@ class AssessmentManager:
 # Global instance
 assessment_manager = AssessmentManager()
 
+def _json_default(obj):
+    """Serialize values the JSON encoders don't handle natively"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        # Timestamps in this module are naive UTC (datetime.utcnow)
+        return obj.isoformat() + "+00:00" if obj.tzinfo is None else obj.isoformat()
+    if isinstance(obj, MappingProxyType):
+        # Frozen scenario template entries
+        return dict(obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def to_json(obj: Any) -> bytes:
+    """Serialize an assessment dataclass (scenario, result, feedback, ...) to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, default=_json_default, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
 # Utility functions for easy access
 def create_user_assessment(user_id: int, assessment_type: AssessmentType = AssessmentType.MOCK_EVENT_PLANNING,
                           difficulty: DifficultyLevel = DifficultyLevel.INTERMEDIATE,
@@ -1235,7 +1467,7 @@ def submit_user_decision(user_id: int, decision_id: str, choice: str,
         decision_id=decision_id,
         choice_made=choice,
         rationale=rationale,
-        timestamp=datetime.utcnow(),
+        timestamp_ms=time.time_ns() // 1_000_000,
         time_taken=30,  # Default time
         confidence_level=confidence
     )
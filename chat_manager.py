@@ -4,9 +4,11 @@ Handles real-time chat, file sharing, moderation, and presence
 """
 
 import os
+import re
 import uuid
 import logging
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from werkzeug.utils import secure_filename
@@ -14,18 +16,90 @@ from PIL import Image
 import io
 
 from flask import current_app
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import contains_eager, joinedload, load_only
 from database import db
+from models import User
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 from models_chat import (
     ChatRoom, ChatMessage, ChatParticipant, ChatModerator, 
     ChatModerationLog, UserPresence, ChatFileShare,
-    ChatRoomType, MessageType, ModerationAction, UserStatus
+    ChatRoomType, MessageType, ModerationAction, UserStatus, muted_now
 )
 
 logger = logging.getLogger(__name__)
 
+# @username mentions in message content
+_MENTION_RE = re.compile(r'@(\w+)')
+
+# Uploads are copied to disk in chunks of this size
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Shared workers for thumbnail rendering; Pillow releases the GIL while
+# decoding, resizing and encoding, so a burst of image uploads renders in
+# parallel without starting a thread per upload
+_THUMBNAIL_POOL = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='chat-thumbnail'
+)
+
+# Redis lifetimes (seconds) for ephemeral presence and typing state; presence
+# matches the five-minute window UserPresence.is_online() uses
+_PRESENCE_TTL = 300
+_TYPING_TTL = 5
+
+# Redis lifetime (seconds) of a room's cached membership/mute flags; joins,
+# leaves and (un)mutes drop the cache immediately
+_MEMBERSHIP_TTL = 60
+
+# Redis lifetime (seconds) of a cached per-user unread count; new messages bump
+# it and reading the room drops it
+_UNREAD_TTL = 300
+
+# Increment only counters that are already cached, so a missing key keeps
+# meaning "count it from the database"
+_INCR_EXISTING_LUA = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCR', key)
+    end
+end
+"""
+
+# Redis hash of per-file download counts not yet written to chat_file_shares,
+# and how often (seconds) the background flusher moves them into the database
+_DOWNLOADS_KEY = 'chat:file:downloads'
+DOWNLOAD_FLUSH_INTERVAL = 30
+
+# Characters of message content returned by get_messages(preview=True)
+_PREVIEW_LENGTH = 120
+
+
+def _upsert(model, values: Dict, index_elements: List[str], set_: Dict):
+    """INSERT ... ON CONFLICT DO UPDATE for the bound dialect (ON DUPLICATE KEY UPDATE on MySQL)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        # A list keeps set_'s order; MySQL evaluates each assignment against the already-updated row
+        return mysql_insert(model).values(**values).on_duplicate_key_update(list(set_.items()))
+    insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+    return insert(model).values(**values).on_conflict_do_update(
+        index_elements=index_elements, set_=set_
+    )
+
+
 class ChatManager:
     """Enhanced chat manager with comprehensive features"""
     
+    # Upload folders already created in this process
+    _ready_folders = set()
+    
     def __init__(self, upload_folder=None):
         self.upload_folder = upload_folder or os.path.join(current_app.instance_path, 'chat_uploads')
         self.thumbnail_folder = os.path.join(self.upload_folder, 'thumbnails')
@@ -36,13 +110,40 @@ class ChatManager:
             'video': {'mp4', 'webm', 'avi', 'mov'},
             'archives': {'zip', 'rar', '7z', 'tar', 'gz'}
         }
+        # Flattened lookups so upload checks are single set/dict probes
+        self._all_extensions = frozenset().union(*self.allowed_extensions.values())
+        self._ext_to_message_type = {
+            **{ext: MessageType.VIDEO for ext in self.allowed_extensions['video']},
+            **{ext: MessageType.AUDIO for ext in self.allowed_extensions['audio']},
+            **{ext: MessageType.IMAGE for ext in self.allowed_extensions['images']}
+        }
         self.max_file_size = 50 * 1024 * 1024  # 50MB
+        self.redis = self.setup_redis()
         self.ensure_upload_folders()
     
+    def setup_redis(self):
+        """Connect to Redis for ephemeral chat state (None keeps all of it in the database)"""
+        self._incr_existing = None
+        redis_url = current_app.config.get('REDIS_URL')
+        if not (REDIS_AVAILABLE and redis_url):
+            return None
+        try:
+            client = redis.Redis.from_url(redis_url, decode_responses=True)
+            client.ping()
+            # Registered once: the Script object runs by SHA and reloads itself after a SCRIPT FLUSH
+            self._incr_existing = client.register_script(_INCR_EXISTING_LUA)
+            return client
+        except redis.RedisError as e:
+            logger.warning(f"Redis unavailable, chat state stays in the database: {e}")
+            return None
+    
     def ensure_upload_folders(self):
-        """Ensure upload folders exist"""
+        """Ensure upload folders exist (once per process for each upload folder)"""
+        if self.upload_folder in ChatManager._ready_folders:
+            return
         os.makedirs(self.upload_folder, exist_ok=True)
         os.makedirs(self.thumbnail_folder, exist_ok=True)
+        ChatManager._ready_folders.add(self.upload_folder)
     
     # Room Management
     def create_room(self, name: str, creator_id: int, room_type: ChatRoomType = ChatRoomType.GENERAL,
@@ -61,9 +162,14 @@ class ChatManager:
             db.session.add(room)
             db.session.flush()  # Get the room ID
             
-            # Add creator as participant and moderator
-            self.join_room(room.id, creator_id)
-            self.add_moderator(room.id, creator_id, creator_id, can_manage_room=True)
+            # Add creator as participant and moderator, committed together with the room
+            result = self.join_room(room.id, creator_id, commit=False)
+            if result['success']:
+                result = self.add_moderator(room.id, creator_id, creator_id, commit=False,
+                                            can_manage_room=True)
+            if not result['success']:
+                db.session.rollback()
+                return result
             
             db.session.commit()
             
@@ -79,20 +185,190 @@ class ChatManager:
         """Get room by ID"""
         return ChatRoom.query.filter_by(id=room_id, is_active=True).first()
     
+    def is_participant(self, room: ChatRoom, user_id: int) -> bool:
+        """Whether user_id is an active participant, answered from Redis when available"""
+        membership = self._cached_membership(room.id, user_id)
+        if membership is None:
+            return room.is_user_participant(user_id)
+        return membership[0]
+    
+    def can_send_messages(self, room: ChatRoom, user_id: int) -> bool:
+        """Whether user_id is an active, unmuted participant, answered from Redis when available"""
+        membership = self._cached_membership(room.id, user_id)
+        if membership is None:
+            return room.can_user_send_messages(user_id)
+        return membership == (True, False)
+    
+    def is_moderator(self, room: ChatRoom, user_id: int) -> bool:
+        """Whether user_id is an active moderator, answered from Redis when available"""
+        if not self.redis:
+            return room.is_user_moderator(user_id)
+        key = f"room_moderators:{room.id}"
+        try:
+            pipe = self.redis.pipeline()
+            pipe.sismember(key, str(user_id))
+            pipe.exists(key)
+            is_member, loaded = pipe.execute()
+            if not loaded:
+                # Fill the set for the whole room; the _loaded member keeps rooms
+                # without moderators cached too
+                moderator_ids = [str(moderator_id) for (moderator_id,) in db.session.query(
+                    ChatModerator.user_id
+                ).filter_by(room_id=room.id, is_active=True)]
+                pipe = self.redis.pipeline()
+                pipe.sadd(key, '_loaded', *moderator_ids)
+                pipe.expire(key, _MEMBERSHIP_TTL)
+                pipe.execute()
+                is_member = str(user_id) in moderator_ids
+            return bool(is_member)
+        except redis.RedisError as e:
+            logger.warning(f"Redis moderator lookup failed: {e}")
+            return room.is_user_moderator(user_id)
+    
+    def invalidate_room_members(self, room_id: int):
+        """Drop a room's cached membership after joins, leaves and (un)mutes"""
+        if not self.redis:
+            return
+        try:
+            self.redis.delete(f"room_members:{room_id}")
+        except redis.RedisError as e:
+            logger.warning(f"Redis membership invalidation failed: {e}")
+    
+    def invalidate_room_moderators(self, room_id: int):
+        """Drop a room's cached moderator set after it changes"""
+        if not self.redis:
+            return
+        try:
+            self.redis.delete(f"room_moderators:{room_id}")
+        except redis.RedisError as e:
+            logger.warning(f"Redis moderator invalidation failed: {e}")
+    
+    def _cached_membership(self, room_id: int, user_id: int):
+        """(is_participant, is_muted) from the Redis room hash, or None without Redis"""
+        if not self.redis:
+            return None
+        key = f"room_members:{room_id}"
+        try:
+            flag, loaded = self.redis.hmget(key, str(user_id), '_loaded')
+            if loaded is None:
+                flag = self._load_room_members(room_id).get(str(user_id))
+            return flag is not None, flag == '1'
+        except redis.RedisError as e:
+            logger.warning(f"Redis membership lookup failed: {e}")
+            return None
+    
+    def _load_room_members(self, room_id: int) -> Dict[str, str]:
+        """Fill a room's Redis membership hash from the database and return it"""
+        # One query covers every active participant; the _loaded field keeps
+        # rooms with no participants cached too
+        members = {
+            str(member_id): '1' if is_muted else '0'
+            for member_id, is_muted in db.session.query(
+                ChatParticipant.user_id, muted_now(datetime.utcnow())
+            ).filter_by(room_id=room_id, is_active=True)
+        }
+        members['_loaded'] = '1'
+        key = f"room_members:{room_id}"
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping=members)
+        pipe.expire(key, _MEMBERSHIP_TTL)
+        pipe.execute()
+        return members
+    
+    def get_cached_unread(self, user_id: int, room_ids: List[int]) -> Dict[int, int]:
+        """Unread counts already cached in Redis for the given rooms"""
+        if not (self.redis and room_ids):
+            return {}
+        try:
+            counts = self.redis.mget([f"unread:{user_id}:{room_id}" for room_id in room_ids])
+            return {room_id: int(count) for room_id, count in zip(room_ids, counts) if count is not None}
+        except redis.RedisError as e:
+            logger.warning(f"Redis unread lookup failed: {e}")
+            return {}
+    
+    def cache_unread(self, user_id: int, counts: Dict[int, int]):
+        """Store unread counts computed from the database"""
+        if not (self.redis and counts):
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for room_id, count in counts.items():
+                pipe.set(f"unread:{user_id}:{room_id}", count, ex=_UNREAD_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Redis unread update failed: {e}")
+    
+    def invalidate_unread(self, room_id: int, user_id: int):
+        """Drop a user's cached unread count after their read marker moves"""
+        if not self.redis:
+            return
+        try:
+            self.redis.delete(f"unread:{user_id}:{room_id}")
+        except redis.RedisError as e:
+            logger.warning(f"Redis unread invalidation failed: {e}")
+    
+    def bump_unread(self, room_id: int):
+        """Count a new message against every active participant's cached unread total"""
+        if not self.redis:
+            return
+        try:
+            members = self.redis.hgetall(f"room_members:{room_id}") or self._load_room_members(room_id)
+            keys = [f"unread:{member_id}:{room_id}" for member_id in members if member_id != '_loaded']
+            if keys:
+                self._incr_existing(keys=keys)
+        except redis.RedisError as e:
+            logger.warning(f"Redis unread increment failed: {e}")
+    
     def get_user_rooms(self, user_id: int) -> List[Dict]:
         """Get all rooms user is participating in"""
         try:
-            participants = ChatParticipant.query.filter_by(
-                user_id=user_id, is_active=True
-            ).all()
+            # Memberships with their (active) rooms loaded by the same query
+            participants = ChatParticipant.query.join(ChatParticipant.room).options(
+                contains_eager(ChatParticipant.room)
+            ).filter(
+                ChatParticipant.user_id == user_id,
+                ChatParticipant.is_active == True,
+                ChatRoom.is_active == True
+            ).order_by(ChatParticipant.id).all()
+            if not participants:
+                return []
+            
+            # Unread counts come from Redis where cached; the rest are counted in one
+            # grouped query, as are the active participant counts
+            room_ids = [participant.room_id for participant in participants]
+            unread_counts = self.get_cached_unread(user_id, room_ids)
+            uncounted = [room_id for room_id in room_ids if room_id not in unread_counts]
+            if uncounted:
+                counted = dict(db.session.query(
+                    ChatMessage.room_id, func.count(ChatMessage.id)
+                ).join(ChatParticipant, and_(
+                    ChatParticipant.room_id == ChatMessage.room_id,
+                    ChatParticipant.user_id == user_id
+                )).filter(
+                    ChatMessage.room_id.in_(uncounted),
+                    or_(
+                        ChatParticipant.last_read_message_id.is_(None),
+                        ChatMessage.id > ChatParticipant.last_read_message_id
+                    )
+                ).group_by(ChatMessage.room_id).all())
+                counted = {room_id: counted.get(room_id, 0) for room_id in uncounted}
+                self.cache_unread(user_id, counted)
+                unread_counts.update(counted)
+            participant_counts = dict(db.session.query(
+                ChatParticipant.room_id, func.count(ChatParticipant.id)
+            ).filter(
+                ChatParticipant.room_id.in_(room_ids),
+                ChatParticipant.is_active == True
+            ).group_by(ChatParticipant.room_id).all())
             
             rooms = []
             for participant in participants:
-                if participant.room and participant.room.is_active:
-                    room_data = participant.room.to_dict()
-                    room_data['unread_count'] = participant.get_unread_count()
-                    room_data['last_seen'] = participant.last_seen.isoformat()
-                    rooms.append(room_data)
+                room_data = participant.room.to_dict(
+                    participant_count=participant_counts.get(participant.room_id, 0)
+                )
+                room_data['unread_count'] = unread_counts.get(participant.room_id, 0)
+                room_data['last_seen'] = participant.last_seen.isoformat()
+                rooms.append(room_data)
             
             return rooms
             
@@ -114,40 +390,48 @@ class ChatManager:
             return []
     
     # Participant Management
-    def join_room(self, room_id: int, user_id: int) -> Dict:
-        """Join a chat room"""
+    def join_room(self, room_id: int, user_id: int, commit: bool = True) -> Dict:
+        """Join a chat room (pass commit=False when the caller owns the transaction)"""
         try:
             room = self.get_room(room_id)
             if not room:
                 return {'success': False, 'error': 'Room not found'}
             
-            # Check if already a participant
-            existing = ChatParticipant.query.filter_by(
-                room_id=room_id, user_id=user_id
-            ).first()
-            
-            if existing:
-                if not existing.is_active:
-                    existing.is_active = True
-                    existing.joined_at = datetime.utcnow()
-            else:
-                participant = ChatParticipant(
-                    room_id=room_id,
-                    user_id=user_id
-                )
-                db.session.add(participant)
-            
-            # Update user presence
-            self.update_user_presence(user_id, room_id=room_id)
-            
-            db.session.commit()
+            now = datetime.utcnow()
+            
+            # Insert the membership, or reactivate it (restarting joined_at) if the user had left
+            db.session.execute(_upsert(
+                ChatParticipant,
+                {'room_id': room_id, 'user_id': user_id, 'joined_at': now},
+                ['room_id', 'user_id'],
+                {
+                    # Listed before is_active so MySQL still reads the old value
+                    'joined_at': case((ChatParticipant.is_active, ChatParticipant.joined_at), else_=now),
+                    'is_active': True,
+                },
+            ))
+            
+            # Point the user's presence at this room
+            db.session.execute(_upsert(
+                UserPresence,
+                {'user_id': user_id, 'current_room_id': room_id, 'last_seen': now},
+                ['user_id'],
+                {'current_room_id': room_id, 'last_seen': now},
+            ))
+            
+            if commit:
+                db.session.commit()
+                self.invalidate_room_members(room_id)
+                self.cache_presence(user_id, None, now)
             
             logger.info(f"User {user_id} joined room {room_id}")
             return {'success': True, 'room': room.to_dict()}
             
         except Exception as e:
             logger.error(f"Error joining room: {e}")
-            db.session.rollback()
+            # With commit=False the caller owns the transaction and rolls it back
+            if commit:
+                db.session.rollback()
             return {'success': False, 'error': str(e)}
     
     def leave_room(self, room_id: int, user_id: int) -> Dict:
@@ -167,6 +451,8 @@ class ChatManager:
                 presence.current_room_id = None
             
             db.session.commit()
+            self.invalidate_room_members(room_id)
+            self.invalidate_unread(room_id, user_id)
             
             logger.info(f"User {user_id} left room {room_id}")
             return {'success': True}
@@ -179,26 +465,43 @@ class ChatManager:
     def get_room_participants(self, room_id: int) -> List[Dict]:
         """Get active participants in a room"""
         try:
+            # Users come from the join and their presence rows ride along in the same query
+            # Mute expiry is evaluated by the database in the same pass
             participants = ChatParticipant.query.filter_by(
                 room_id=room_id, is_active=True
-            ).join(ChatParticipant.user).all()
+            ).join(ChatParticipant.user).options(
+                contains_eager(ChatParticipant.user).joinedload(User.presence)
+            ).add_columns(
+                muted_now(datetime.utcnow()).label('is_muted_now')
+            ).all()
+            
+            live_presence = self.get_cached_presence([p.user_id for p, _ in participants])
             
             result = []
-            for participant in participants:
+            for participant, is_muted_now in participants:
                 user_data = {
                     'user_id': participant.user.id,
                     'username': participant.user.username,
                     'full_name': participant.user.full_name,
                     'joined_at': participant.joined_at.isoformat(),
                     'last_seen': participant.last_seen.isoformat(),
-                    'is_muted': participant.is_currently_muted()
+                    'is_muted': bool(is_muted_now)
                 }
                 
                 # Add presence info
-                presence = UserPresence.query.filter_by(user_id=participant.user.id).first()
+                presence = participant.user.presence
                 if presence:
-                    user_data['status'] = presence.status.value
-                    user_data['is_online'] = presence.is_online()
+                    status, last_seen = presence.status, presence.last_seen
+                    # Redis holds the latest activity between database writes
+                    live = live_presence.get(participant.user_id)
+                    if live:
+                        status = UserStatus(live.get('status', status.value))
+                        last_seen = max(last_seen, datetime.fromisoformat(live['last_seen']))
+                    user_data['status'] = status.value
+                    user_data['is_online'] = (
+                        status != UserStatus.OFFLINE
+                        and datetime.utcnow() - last_seen < timedelta(minutes=5)
+                    )
                 
                 result.append(user_data)
             
@@ -211,15 +514,19 @@ class ChatManager:
     # Message Management
     def send_message(self, room_id: int, user_id: int, content: str, 
                     message_type: MessageType = MessageType.TEXT, 
-                    reply_to_id: int = None, file_data: Dict = None) -> Dict:
-        """Send a message to a chat room"""
+                    reply_to_id: int = None, file_data: Dict = None, commit: bool = True) -> Dict:
+        """Send a message to a chat room
+
+        With commit=False the caller owns the transaction and must call
+        publish_message once it commits.
+        """
         try:
             room = self.get_room(room_id)
             if not room:
                 return {'success': False, 'error': 'Room not found'}
             
             # Check if user can send messages
-            if not room.can_user_send_messages(user_id):
+            if not self.can_send_messages(room, user_id):
                 return {'success': False, 'error': 'You are not allowed to send messages'}
             
             # Create message
@@ -247,33 +554,40 @@ class ChatManager:
             db.session.flush()
             
             # Update participant's last activity
-            participant = ChatParticipant.query.filter_by(
+            ChatParticipant.query.filter_by(
                 room_id=room_id, user_id=user_id
-            ).first()
-            if participant:
-                participant.last_seen = datetime.utcnow()
+            ).update({'last_seen': datetime.utcnow()}, synchronize_session=False)
             
-            db.session.commit()
+            message_data = message.to_dict()
+            if commit:
+                db.session.commit()
+                self.publish_message(room_id, message_data)
             
             logger.info(f"Message sent by user {user_id} in room {room_id}")
             return {
                 'success': True, 
-                'message': message.to_dict(),
+                'message': message_data,
                 'message_id': message.id
             }
             
         except Exception as e:
             logger.error(f"Error sending message: {e}")
-            db.session.rollback()
+            # With commit=False the caller owns the transaction and rolls it back
+            if commit:
+                db.session.rollback()
             return {'success': False, 'error': str(e)}
     
     def get_messages(self, room_id: int, user_id: int, limit: int = 50, 
-                    before_id: int = None) -> List[Dict]:
-        """Get messages from a chat room"""
+                    before_id: int = None, commit: bool = True, preview: bool = False) -> List[Dict]:
+        """Get messages from a chat room (pass commit=False when the caller owns the transaction)
+
+        preview=True returns slim summaries with truncated content, loads only the
+        columns they need, and leaves the read marker alone.
+        """
         try:
             # Check if user is participant
             room = self.get_room(room_id)
-            if not room or not room.is_user_participant(user_id):
+            if not room or not self.is_participant(room, user_id):
                 return []
             
             query = ChatMessage.query.filter_by(
@@ -283,19 +597,38 @@ class ChatManager:
             if before_id:
                 query = query.filter(ChatMessage.id < before_id)
             
-            messages = query.order_by(ChatMessage.created_at.desc()).limit(limit).all()
+            # Authors come back in the same query instead of one lazy load per message
+            author = joinedload(ChatMessage.user).load_only(User.id, User.username, User.full_name)
+            
+            if preview:
+                rows = query.options(
+                    load_only(ChatMessage.id, ChatMessage.room_id, ChatMessage.user_id,
+                              ChatMessage.message_type, ChatMessage.created_at),
+                    author
+                ).add_columns(
+                    func.substr(ChatMessage.content, 1, _PREVIEW_LENGTH)
+                ).order_by(ChatMessage.id.desc()).limit(limit).all()
+                return [msg.to_preview_dict(snippet) for msg, snippet in reversed(rows)]
             
-            # Mark messages as read
+            # Newest first by id, which walks the (room_id, is_deleted, id) index
+            messages = query.options(author).order_by(ChatMessage.id.desc()).limit(limit).all()
+            
+            # Serialize before the commit below expires the loaded rows
+            result = [msg.to_dict() for msg in reversed(messages)]
+            
+            # Mark messages as read with a single UPDATE, no SELECT of the participant first
             if messages:
-                participant = ChatParticipant.query.filter_by(
+                ChatParticipant.query.filter_by(
                     room_id=room_id, user_id=user_id
-                ).first()
-                if participant:
-                    participant.last_read_message_id = messages[0].id
-                    participant.last_seen = datetime.utcnow()
+                ).update({
+                    'last_read_message_id': messages[0].id,
+                    'last_seen': datetime.utcnow()
+                }, synchronize_session=False)
+                if commit:
                     db.session.commit()
+                self.invalidate_unread(room_id, user_id)
             
-            return [msg.to_dict() for msg in reversed(messages)]
+            return result
             
         except Exception as e:
             logger.error(f"Error getting messages: {e}")
@@ -359,29 +692,39 @@ class ChatManager:
     def add_reaction(self, message_id: int, user_id: int, emoji: str) -> Dict:
         """Add reaction to a message"""
         try:
-            message = ChatMessage.query.filter_by(id=message_id).first()
+            # Lock the row so concurrent reactions apply one after another
+            # instead of overwriting each other's copy of the JSON
+            message = ChatMessage.query.filter_by(id=message_id).with_for_update().first()
             if not message:
                 return {'success': False, 'error': 'Message not found'}
             
             message.add_reaction(emoji, user_id)
-            return {'success': True, 'reactions': message.reactions}
+            reactions = message.reactions or {}
+            db.session.commit()
+            return {'success': True, 'reactions': reactions}
             
         except Exception as e:
             logger.error(f"Error adding reaction: {e}")
+            db.session.rollback()
             return {'success': False, 'error': str(e)}
     
     def remove_reaction(self, message_id: int, user_id: int, emoji: str) -> Dict:
         """Remove reaction from a message"""
         try:
-            message = ChatMessage.query.filter_by(id=message_id).first()
+            # Lock the row so concurrent reactions apply one after another
+            # instead of overwriting each other's copy of the JSON
+            message = ChatMessage.query.filter_by(id=message_id).with_for_update().first()
             if not message:
                 return {'success': False, 'error': 'Message not found'}
             
             message.remove_reaction(emoji, user_id)
-            return {'success': True, 'reactions': message.reactions}
+            reactions = message.reactions or {}
+            db.session.commit()
+            return {'success': True, 'reactions': reactions}
             
         except Exception as e:
             logger.error(f"Error removing reaction: {e}")
+            db.session.rollback()
             return {'success': False, 'error': str(e)}
     
     # File Sharing
@@ -391,14 +734,6 @@ class ChatManager:
             if not file or file.filename == '':
                 return {'success': False, 'error': 'No file selected'}
             
-            # Check file size
-            file.seek(0, 2)  # Seek to end
-            file_size = file.tell()
-            file.seek(0)  # Reset to beginning
-            
-            if file_size > self.max_file_size:
-                return {'success': False, 'error': 'File too large'}
-            
             # Check file type
             filename = secure_filename(file.filename)
             file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
@@ -410,16 +745,14 @@ class ChatManager:
             unique_filename = f"{uuid.uuid4()}_{filename}"
             file_path = os.path.join(self.upload_folder, unique_filename)
             
-            # Save file
-            file.save(file_path)
+            # Save file, enforcing the size limit while streaming it to disk
+            file_size = self.save_upload(file.stream, file_path)
+            if file_size is None:
+                return {'success': False, 'error': 'File too large'}
             
-            # Determine file type and create thumbnail if image
+            # Determine file type; image thumbnails are rendered in the background
             mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
             is_image = file_ext in self.allowed_extensions['images']
-            thumbnail_path = None
-            
-            if is_image:
-                thumbnail_path = self.create_thumbnail(file_path, unique_filename)
             
             # Create message with file
             message_type = self.get_message_type_for_file(file_ext)
@@ -437,7 +770,8 @@ class ChatManager:
                 user_id=user_id,
                 content=content,
                 message_type=message_type,
-                file_data=file_data
+                file_data=file_data,
+                commit=False
             )
             
             if result['success']:
@@ -452,21 +786,97 @@ class ChatManager:
                     file_size=file_size,
                     file_type=file_ext,
                     mime_type=mime_type,
-                    is_image=is_image,
-                    thumbnail_path=thumbnail_path
+                    is_image=is_image
                 )
                 
                 db.session.add(file_share)
                 db.session.commit()
+                self.publish_message(room_id, result['message'])
                 
                 result['file_share_id'] = file_share.id
+                result['thumbnail_pending'] = is_image
+                if is_image:
+                    self.schedule_thumbnail(file_share.id, room_id, file_path, unique_filename)
+            else:
+                db.session.rollback()
             
             return result
             
         except Exception as e:
             logger.error(f"Error uploading file: {e}")
+            db.session.rollback()
             return {'success': False, 'error': str(e)}
     
+    def save_upload(self, stream, file_path: str) -> Optional[int]:
+        """Copy an upload stream to disk in chunks and return its size.
+
+        Returns None, removing the partial file, once the upload exceeds max_file_size.
+        """
+        # One reusable buffer: each chunk is read into it and written straight from
+        # it, rather than allocating a fresh bytes object per chunk
+        buffer = bytearray(_UPLOAD_CHUNK_SIZE)
+        view = memoryview(buffer)
+        written = 0
+        with open(file_path, 'wb') as out:
+            while size := stream.readinto(buffer):
+                written += size
+                if written > self.max_file_size:
+                    break
+                out.write(view[:size])
+            else:
+                return written
+        os.unlink(file_path)
+        return None
+    
+    def publish_message(self, room_id: int, message_data: Dict):
+        """Deliver a committed message to the room and count it as unread for its members"""
+        self.broadcast(room_id, 'new_chat_message', message_data)
+        self.bump_unread(room_id)
+    
+    def broadcast(self, room_id: int, event: str, data: Dict):
+        """Emit an event to everyone in a room's Socket.IO channel.
+
+        With REDIS_URL set, Flask-SocketIO turns this into a single publish on
+        its Redis message queue, and each worker pushes it to its own sockets.
+        """
+        socketio = current_app.extensions.get('socketio')
+        if not socketio:
+            return
+        try:
+            socketio.emit(event, data, room=f"chat_{room_id}")
+        except Exception as e:
+            logger.error(f"Error broadcasting {event} to room {room_id}: {e}")
+    
+    def schedule_thumbnail(self, file_share_id: int, room_id: int, file_path: str, filename: str):
+        """Render an image thumbnail off the request path.
+
+        The worker stores the thumbnail path on the ChatFileShare row and emits
+        ``thumbnail_ready`` to the room so clients can replace their placeholder.
+        """
+        app = current_app._get_current_object()
+        
+        def worker():
+            with app.app_context():
+                thumbnail_path = self.create_thumbnail(file_path, filename)
+                if not thumbnail_path:
+                    return
+                try:
+                    ChatFileShare.query.filter_by(id=file_share_id).update(
+                        {'thumbnail_path': thumbnail_path}, synchronize_session=False
+                    )
+                    db.session.commit()
+                except Exception as e:
+                    logger.error(f"Error saving thumbnail for file {file_share_id}: {e}")
+                    db.session.rollback()
+                    return
+                
+                self.broadcast(room_id, 'thumbnail_ready', {
+                    'file_share_id': file_share_id,
+                    'thumbnail_url': f"/api/chat/files/{file_share_id}/thumbnail"
+                })
+        
+        _THUMBNAIL_POOL.submit(worker)
+    
     def create_thumbnail(self, file_path: str, filename: str) -> str:
         """Create thumbnail for image"""
         try:
@@ -479,7 +889,7 @@ class ChatManager:
                     img = img.convert("RGB")
                 
                 # Create thumbnail
-                img.thumbnail((300, 300), Image.Resampling.LANCZOS)
+                img.thumbnail((300, 300), Image.Resampling.BILINEAR)
                 img.save(thumbnail_path, "JPEG", quality=85)
             
             return thumbnail_path
@@ -488,28 +898,79 @@ class ChatManager:
             logger.error(f"Error creating thumbnail: {e}")
             return None
     
+    def record_download(self, file_share_id: int):
+        """Count a file download, buffering the increment in Redis when available"""
+        if self.redis:
+            try:
+                self.redis.hincrby(_DOWNLOADS_KEY, file_share_id, 1)
+                return
+            except redis.RedisError as e:
+                logger.warning(f"Redis download count failed, using the database: {e}")
+        
+        try:
+            ChatFileShare.query.filter_by(id=file_share_id).update(
+                {'download_count': ChatFileShare.download_count + 1}, synchronize_session=False
+            )
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error recording download for file {file_share_id}: {e}")
+            db.session.rollback()
+    
+    def flush_download_counts(self) -> int:
+        """Write buffered download counts to the database in one UPDATE.
+
+        Returns the number of files updated. Counts that fail to save are put
+        back in Redis for the next flush.
+        """
+        if not self.redis:
+            return 0
+        try:
+            # Read and clear the buffer atomically so concurrent workers never count twice
+            pipe = self.redis.pipeline()
+            pipe.hgetall(_DOWNLOADS_KEY)
+            pipe.delete(_DOWNLOADS_KEY)
+            pending = pipe.execute()[0]
+        except redis.RedisError as e:
+            logger.warning(f"Redis download count flush failed: {e}")
+            return 0
+        if not pending:
+            return 0
+        
+        counts = {int(file_id): int(count) for file_id, count in pending.items()}
+        try:
+            ChatFileShare.query.filter(ChatFileShare.id.in_(counts)).update(
+                {'download_count': ChatFileShare.download_count
+                    + case(counts, value=ChatFileShare.id, else_=0)},
+                synchronize_session=False
+            )
+            db.session.commit()
+            return len(counts)
+        except Exception as e:
+            logger.error(f"Error saving download counts: {e}")
+            db.session.rollback()
+        
+        try:
+            pipe = self.redis.pipeline()
+            for file_id, count in counts.items():
+                pipe.hincrby(_DOWNLOADS_KEY, file_id, count)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not requeue download counts: {e}")
+        return 0
+    
     def get_message_type_for_file(self, file_ext: str) -> MessageType:
         """Get message type based on file extension"""
-        if file_ext in self.allowed_extensions['images']:
-            return MessageType.IMAGE
-        elif file_ext in self.allowed_extensions['audio']:
-            return MessageType.AUDIO
-        elif file_ext in self.allowed_extensions['video']:
-            return MessageType.VIDEO
-        else:
-            return MessageType.FILE
+        return self._ext_to_message_type.get(file_ext, MessageType.FILE)
     
     def is_allowed_file(self, file_ext: str) -> bool:
         """Check if file type is allowed"""
-        for category in self.allowed_extensions.values():
-            if file_ext in category:
-                return True
-        return False
+        return file_ext in self._all_extensions
     
     # User Presence
     def update_user_presence(self, user_id: int, status: UserStatus = None, 
-                           custom_status: str = None, room_id: int = None) -> Dict:
-        """Update user presence"""
+                           custom_status: str = None, room_id: int = None,
+                           commit: bool = True) -> Dict:
+        """Update user presence (pass commit=False when the caller owns the transaction)"""
         try:
             presence = UserPresence.query.filter_by(user_id=user_id).first()
             
@@ -529,7 +990,12 @@ class ChatManager:
             
             presence.last_seen = datetime.utcnow()
             
-            db.session.commit()
+            if commit:
+                db.session.commit()
+            else:
+                db.session.flush()
+            
+            self.cache_presence(user_id, presence.status, presence.last_seen)
             
             return {'success': True, 'presence': {
                 'status': presence.status.value,
@@ -540,11 +1006,28 @@ class ChatManager:
             
         except Exception as e:
             logger.error(f"Error updating presence: {e}")
-            db.session.rollback()
+            # With commit=False the caller owns the transaction and rolls it back
+            if commit:
+                db.session.rollback()
             return {'success': False, 'error': str(e)}
     
     def set_typing_indicator(self, user_id: int, room_id: int, is_typing: bool) -> Dict:
         """Set typing indicator"""
+        if self.redis:
+            # Typing state lives only in Redis and expires on its own if the stop event is lost
+            try:
+                key = f"typing:{room_id}:{user_id}"
+                pipe = self.redis.pipeline()
+                if is_typing:
+                    pipe.setex(key, _TYPING_TTL, 1)
+                else:
+                    pipe.delete(key)
+                self._queue_presence(pipe, user_id, None, datetime.utcnow())
+                pipe.execute()
+                return {'success': True}
+            except redis.RedisError as e:
+                logger.warning(f"Redis typing update failed, using the database: {e}")
+        
         try:
             presence = UserPresence.query.filter_by(user_id=user_id).first()
             
@@ -567,10 +1050,42 @@ class ChatManager:
             db.session.rollback()
             return {'success': False, 'error': str(e)}
     
+    def cache_presence(self, user_id: int, status: Optional[UserStatus], last_seen: datetime):
+        """Record a user's latest presence in Redis"""
+        if not self.redis:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            self._queue_presence(pipe, user_id, status, last_seen)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Redis presence update failed: {e}")
+    
+    def _queue_presence(self, pipe, user_id: int, status: Optional[UserStatus], last_seen: datetime):
+        key = f"presence:{user_id}"
+        mapping = {'last_seen': last_seen.isoformat()}
+        if status:
+            mapping['status'] = status.value
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, _PRESENCE_TTL)
+    
+    def get_cached_presence(self, user_ids: List[int]) -> Dict[int, Dict[str, str]]:
+        """Fetch Redis presence hashes for several users in one round trip"""
+        if not (self.redis and user_ids):
+            return {}
+        try:
+            pipe = self.redis.pipeline()
+            for user_id in user_ids:
+                pipe.hgetall(f"presence:{user_id}")
+            return {user_id: data for user_id, data in zip(user_ids, pipe.execute()) if data}
+        except redis.RedisError as e:
+            logger.warning(f"Redis presence lookup failed: {e}")
+            return {}
+    
     # Moderation
     def add_moderator(self, room_id: int, user_id: int, assigned_by: int, 
-                     **permissions) -> Dict:
-        """Add moderator to room"""
+                     commit: bool = True, **permissions) -> Dict:
+        """Add moderator to room (pass commit=False when the caller owns the transaction)"""
         try:
             # Check if already a moderator
             existing = ChatModerator.query.filter_by(
@@ -595,13 +1110,19 @@ class ChatManager:
                 )
                 db.session.add(moderator)
             
-            db.session.commit()
+            if commit:
+                db.session.commit()
+                self.invalidate_room_moderators(room_id)
+            else:
+                db.session.flush()
             
             return {'success': True}
             
         except Exception as e:
             logger.error(f"Error adding moderator: {e}")
-            db.session.rollback()
+            # With commit=False the caller owns the transaction and rolls it back
+            if commit:
+                db.session.rollback()
             return {'success': False, 'error': str(e)}
     
     def mute_user(self, room_id: int, user_id: int, moderator_id: int, 
@@ -633,6 +1154,7 @@ class ChatManager:
             
             db.session.add(log)
             db.session.commit()
+            self.invalidate_room_members(room_id)
             
             return {'success': True}
             
@@ -655,6 +1177,7 @@ class ChatManager:
             participant.muted_until = None
             
             db.session.commit()
+            self.invalidate_room_members(room_id)
             
             return {'success': True}
             
@@ -665,24 +1188,16 @@ class ChatManager:
     
     def extract_mentions(self, content: str) -> List[int]:
         """Extract user mentions from message content"""
-        # Simple implementation - look for @username patterns
-        # In a real implementation, you'd want to validate usernames
-        import re
-        mentions = []
-        
         # Find @username patterns
-        pattern = r'@(\w+)'
-        matches = re.findall(pattern, content)
-        
-        if matches:
-            # Look up user IDs (simplified)
-            from models import User
-            for username in matches:
-                user = User.query.filter_by(username=username).first()
-                if user:
-                    mentions.append(user.id)
+        matches = _MENTION_RE.findall(content)
+        if not matches:
+            return []
         
-        return mentions
+        # Look up all mentioned usernames in one query, keeping mention order
+        user_ids = dict(
+            db.session.query(User.username, User.id).filter(User.username.in_(set(matches))).all()
+        )
+        return [user_ids[username] for username in matches if username in user_ids]
 
 # Global chat manager instance
 chat_manager = ChatManager()
@@ -5,11 +5,12 @@ Provides REST endpoints for chat functionality
 
 import os
 import logging
-from flask import Blueprint, request, jsonify, current_app, send_file, abort
+from flask import Blueprint, request, jsonify, current_app, send_file, abort, g
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import HTTPException
+from werkzeug.utils import secure_filename, send_file as _werkzeug_send_file
 
-from chat_manager import get_chat_manager
+from chat_manager import DOWNLOAD_FLUSH_INTERVAL, get_chat_manager
 from models_chat import ChatRoom, ChatRoomType, MessageType, UserStatus
 from models import Event
 
@@ -18,12 +19,41 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 chat_bp = Blueprint('chat', __name__, url_prefix='/api/chat')
 
+@chat_bp.before_request
+def load_chat_manager():
+    """Look the shared chat manager up once per request for every handler"""
+    g.chat_manager = get_chat_manager()
+
+def _send_chat_file(path, **kwargs):
+    """Send an uploaded chat file, handing the transfer to nginx when configured
+
+    With CHAT_ACCEL_REDIRECT_PREFIX set, the response carries only headers and an
+    X-Accel-Redirect to the internal location mapped onto the upload folder, so the
+    worker returns immediately and nginx streams the bytes with sendfile(2).
+    """
+    prefix = current_app.config.get('CHAT_ACCEL_REDIRECT_PREFIX')
+    if not prefix:
+        return send_file(path, **kwargs)
+    
+    # Let werkzeug build the headers (Content-Disposition, ETag, ...) without opening the file
+    response = _werkzeug_send_file(
+        path,
+        request.environ,
+        use_x_sendfile=True,
+        response_class=current_app.response_class,
+        **kwargs
+    )
+    del response.headers['X-Sendfile']
+    relative_path = os.path.relpath(path, g.chat_manager.upload_folder).replace(os.sep, '/')
+    response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative_path
+    return response
+
 @chat_bp.route('/rooms', methods=['GET'])
 @login_required
 def get_user_rooms():
     """Get all chat rooms user is participating in"""
     try:
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         rooms = chat_manager.get_user_rooms(current_user.id)
         
         return jsonify({
@@ -89,7 +119,7 @@ def create_room():
             'is_moderated': data.get('is_moderated', False)
         }
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.create_room(
             name=name,
             creator_id=current_user.id,
@@ -116,7 +146,7 @@ def create_room():
 def test_create_room():
     """Test room creation endpoint"""
     try:
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.create_room(
             name=f"Test Room {current_user.username}",
             creator_id=current_user.id,
@@ -138,7 +168,7 @@ def test_create_room():
 def get_room_details(room_id):
     """Get room details"""
     try:
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         room = chat_manager.get_room(room_id)
         
         if not room:
@@ -147,20 +177,22 @@ def get_room_details(room_id):
                 'error': 'Room not found'
             }), 404
         
+        # One joined query loads the active participants; membership and the
+        # participant count are both answered from that list
+        participants = chat_manager.get_room_participants(room_id)
+        
         # Check if user is participant
-        if not room.is_user_participant(current_user.id):
+        if not any(p['user_id'] == current_user.id for p in participants):
             return jsonify({
                 'success': False,
                 'error': 'Access denied'
             }), 403
         
-        participants = chat_manager.get_room_participants(room_id)
-        
         return jsonify({
             'success': True,
-            'room': room.to_dict(),
+            'room': room.to_dict(participant_count=len(participants)),
             'participants': participants,
-            'is_moderator': room.is_user_moderator(current_user.id)
+            'is_moderator': chat_manager.is_moderator(room, current_user.id)
         })
         
     except Exception as e:
@@ -175,7 +207,7 @@ def get_room_details(room_id):
 def join_room(room_id):
     """Join a chat room"""
     try:
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.join_room(room_id, current_user.id)
         
         if result['success']:
@@ -195,7 +227,7 @@ def join_room(room_id):
 def leave_room(room_id):
     """Leave a chat room"""
     try:
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.leave_room(room_id, current_user.id)
         
         if result['success']:
@@ -217,9 +249,10 @@ def get_messages(room_id):
     try:
         limit = min(int(request.args.get('limit', 50)), 100)  # Max 100 messages
         before_id = request.args.get('before_id', type=int)
+        preview = request.args.get('preview') == '1'
         
-        chat_manager = get_chat_manager()
-        messages = chat_manager.get_messages(room_id, current_user.id, limit, before_id)
+        chat_manager = g.chat_manager
+        messages = chat_manager.get_messages(room_id, current_user.id, limit, before_id, preview=preview)
         
         return jsonify({
             'success': True,
@@ -260,7 +293,7 @@ def send_message(room_id):
                 'error': 'Invalid message type'
             }), 400
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.send_message(
             room_id=room_id,
             user_id=current_user.id,
@@ -295,7 +328,7 @@ def edit_message(message_id):
                 'error': 'Message content is required'
             }), 400
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.edit_message(message_id, current_user.id, new_content)
         
         if result['success']:
@@ -318,12 +351,13 @@ def delete_message(message_id):
         data = request.get_json() or {}
         room_id = data.get('room_id')
         
+        chat_manager = g.chat_manager
+        
         # Check if user is moderator
         is_moderator = False
         if room_id:
-            chat_manager = get_chat_manager()
             room = chat_manager.get_room(room_id)
-            is_moderator = room and room.is_user_moderator(current_user.id)
+            is_moderator = room and chat_manager.is_moderator(room, current_user.id)
         
         result = chat_manager.delete_message(message_id, current_user.id, is_moderator)
         
@@ -353,7 +387,7 @@ def add_reaction(message_id):
                 'error': 'Emoji is required'
             }), 400
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.add_reaction(message_id, current_user.id, emoji)
         
         if result['success']:
@@ -382,7 +416,7 @@ def remove_reaction(message_id):
                 'error': 'Emoji is required'
             }), 400
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.remove_reaction(message_id, current_user.id, emoji)
         
         if result['success']:
@@ -411,7 +445,7 @@ def upload_file(room_id):
         file = request.files['file']
         message_content = request.form.get('message', '')
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.upload_file(file, room_id, current_user.id, message_content)
         
         if result['success']:
@@ -452,21 +486,22 @@ def download_file(file_id):
         
         # Check access permissions (simplified - user must be in the room)
         room = file_share.room
-        if not room.is_user_participant(current_user.id):
+        if not g.chat_manager.is_participant(room, current_user.id):
             abort(403)
         
-        # Update download count
-        file_share.download_count += 1
-        from extensions import db
-        db.session.commit()
+        # Buffered in Redis when available and flushed in batches, so downloads
+        # do not each wait on a write transaction
+        g.chat_manager.record_download(file_share.id)
         
-        return send_file(
+        return _send_chat_file(
             file_share.file_path,
             as_attachment=True,
             download_name=file_share.original_filename,
             mimetype=file_share.mime_type
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading file: {e}")
         abort(500)
@@ -490,14 +525,16 @@ def get_thumbnail(file_id):
         
         # Check access permissions
         room = file_share.room
-        if not room.is_user_participant(current_user.id):
+        if not g.chat_manager.is_participant(room, current_user.id):
             abort(403)
         
-        return send_file(
+        return _send_chat_file(
             file_share.thumbnail_path,
             mimetype='image/jpeg'
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting thumbnail: {e}")
         abort(500)
@@ -524,7 +561,7 @@ def update_presence():
                     'error': 'Invalid status'
                 }), 400
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         result = chat_manager.update_user_presence(
             user_id=current_user.id,
             status=status_enum,
@@ -557,7 +594,7 @@ def get_event_rooms(event_id):
                 'error': 'Event not found'
             }), 404
         
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         rooms = chat_manager.get_event_rooms(event_id)
         
         return jsonify({
@@ -577,7 +614,7 @@ def get_event_rooms(event_id):
 def get_room_participants(room_id):
     """Get participants in a room"""
     try:
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         room = chat_manager.get_room(room_id)
         
         if not room:
@@ -586,15 +623,15 @@ def get_room_participants(room_id):
                 'error': 'Room not found'
             }), 404
         
-        # Check if user is participant
-        if not room.is_user_participant(current_user.id):
+        participants = chat_manager.get_room_participants(room_id)
+        
+        # Check if user is participant, against the list just loaded
+        if not any(p['user_id'] == current_user.id for p in participants):
             return jsonify({
                 'success': False,
                 'error': 'Access denied'
             }), 403
         
-        participants = chat_manager.get_room_participants(room_id)
-        
         return jsonify({
             'success': True,
             'participants': participants
@@ -625,10 +662,10 @@ def mute_user(room_id):
             }), 400
         
         # Check if current user is moderator
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         room = chat_manager.get_room(room_id)
         
-        if not room or not room.is_user_moderator(current_user.id):
+        if not room or not chat_manager.is_moderator(room, current_user.id):
             return jsonify({
                 'success': False,
                 'error': 'Permission denied'
@@ -669,10 +706,10 @@ def unmute_user(room_id):
             }), 400
         
         # Check if current user is moderator
-        chat_manager = get_chat_manager()
+        chat_manager = g.chat_manager
         room = chat_manager.get_room(room_id)
         
-        if not room or not room.is_user_moderator(current_user.id):
+        if not room or not chat_manager.is_moderator(room, current_user.id):
             return jsonify({
                 'success': False,
                 'error': 'Permission denied'
@@ -690,4 +727,30 @@ def unmute_user(room_id):
         return jsonify({
             'success': False,
             'error': 'Failed to unmute user'
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+# Initialize the download count flusher
+def init_download_flusher(app):
+    """Start the background task that writes buffered download counts to the database"""
+    import threading
+    import time
+    
+    if not get_chat_manager().redis:
+        return  # downloads are counted directly in the database
+    
+    def flush_task(app):
+        """Periodically move download counts from Redis into chat_file_shares"""
+        while True:
+            time.sleep(DOWNLOAD_FLUSH_INTERVAL)
+            # A fresh context per flush, so its db session is removed on teardown
+            # instead of one session living for the whole life of the thread
+            with app.app_context():
+                try:
+                    get_chat_manager().flush_download_counts()
+                except Exception as e:
+                    logger.error(f"Download count flush error: {e}")
+    
+    flush_thread = threading.Thread(target=flush_task, args=(app,), daemon=True)
+    flush_thread.start()
+    logger.info("Chat download count flusher started")
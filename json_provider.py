@@ -0,0 +1,48 @@
+"""
+orjson-backed JSON provider for Flask.
+
+Serializes ``jsonify`` responses with orjson, which writes UTF-8 bytes
+directly instead of building a str through the stdlib encoder. Output stays
+compatible with Flask's DefaultJSONProvider: keys are sorted only when
+``sort_keys`` is set (app.py turns it off), datetimes and dates still go
+through Flask's RFC 822 formatting, and debug mode still pretty-prints.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes with orjson"""
+
+    def _options(self):
+        # Hand datetimes to Flask's default hook so their wire format is unchanged
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # Callers passing json.dumps arguments (e.g. the tojson filter) keep the stdlib path
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._options() | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
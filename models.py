@@ -2,6 +2,7 @@ import enum
 from datetime import datetime
 from database import db
 from flask_login import UserMixin
+from sqlalchemy.dialects.postgresql import to_tsvector
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class UserType(enum.Enum):
@@ -92,6 +93,15 @@ class CollaborationToolType(enum.Enum):
     FILE_SHARING = "File Sharing"
     VIDEO_CALL = "Video Call"
 
+def _event_search_vector(*columns):
+    """to_tsvector over the given text columns, joined with spaces (NULLs as '')"""
+    # Inline literals so queries render the exact expression the index is built on
+    empty, space = db.literal_column("''"), db.literal_column("' '")
+    document = db.func.coalesce(columns[0], empty)
+    for column in columns[1:]:
+        document = document.op('||')(space).op('||')(db.func.coalesce(column, empty))
+    return to_tsvector(db.literal_column("'english'"), document)
+
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
@@ -100,7 +110,7 @@ class Event(db.Model):
     event_type = db.Column(db.Enum(EventType), default=EventType.IN_PERSON)
     location = db.Column(db.String(120))
     virtual_link = db.Column(db.String(255))  # For virtual/hybrid events
-    start_date = db.Column(db.DateTime, nullable=False)
+    start_date = db.Column(db.DateTime, nullable=False, index=True)
     end_date = db.Column(db.DateTime, nullable=False)
     image_url = db.Column(db.String(255))  # URL to event image
     max_attendees = db.Column(db.Integer, default=0)  # 0 means unlimited
@@ -132,6 +142,16 @@ class Event(db.Model):
     teams = db.relationship('Team', backref='event', lazy='dynamic', cascade="all, delete-orphan")
     analytics = db.relationship('EventAnalytics', backref='event', uselist=False, cascade="all, delete-orphan")
     collaboration_rooms = db.relationship('CollaborationRoom', backref='event', lazy='dynamic', cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # An organizer's events, listed by start date on the dashboard
+        db.Index('ix_event_organizer_start', organizer_id, start_date),
+        # Covers the calendar's per-category counts (GROUP BY category, MIN(id))
+        db.Index('ix_event_category_id', category, id),
+        # Full-text calendar search over title and description (PostgreSQL only)
+        db.Index('ix_event_search', _event_search_vector(title, description),
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
 
     def attendees_count(self):
         return self.tickets.count()
@@ -154,6 +174,10 @@ class Event(db.Model):
     def __repr__(self):
         return f'<Event {self.title}>'
 
+# Full-text search document for events. PostgreSQL gets a GIN expression index on
+# it; queries must use this same expression for the planner to pick the index.
+EVENT_SEARCH_VECTOR = _event_search_vector(Event.title, Event.description)
+
 class TicketStatus(enum.Enum):
     RESERVED = "Reserved"
     PAID = "Paid"
@@ -162,7 +186,7 @@ class TicketStatus(enum.Enum):
 
 class Ticket(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False, index=True)
     attendee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     status = db.Column(db.Enum(TicketStatus), default=TicketStatus.RESERVED)
     ticket_number = db.Column(db.String(20), unique=True, nullable=False)
@@ -182,6 +206,16 @@ class Ticket(db.Model):
     def __repr__(self):
         return f'<Ticket {self.ticket_number}>'
 
+# Tickets per event as a correlated subquery. Deferred, so it is only inlined into
+# the SELECT when a query asks for it, e.g. options(undefer(Event.ticket_count))
+Event.ticket_count = db.column_property(
+    db.select(db.func.count(Ticket.id))
+    .where(Ticket.event_id == Event.id)
+    .correlate_except(Ticket)
+    .scalar_subquery(),
+    deferred=True
+)
+
 # New Advanced Models
 
 class UserSkill(db.Model):
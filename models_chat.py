@@ -5,10 +5,15 @@ Supports event-specific chat rooms, private messaging, file sharing, and moderat
 
 from datetime import datetime, timedelta
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Enum as SQLEnum
+import logging
+
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, JSON, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy import and_, case, delete, func, inspect, or_, select
 from sqlalchemy.orm import relationship, backref
 from database import db
 
+logger = logging.getLogger(__name__)
+
 class ChatRoomType(Enum):
     EVENT = "event"
     PRIVATE = "private"
@@ -91,12 +96,19 @@ class ChatRoom(db.Model):
     
     def can_user_send_messages(self, user_id):
         """Check if user can send messages"""
-        participant = self.participants.filter_by(user_id=user_id).first()
-        if not participant or not participant.is_active:
+        # Read-only: an expired mute counts as lifted without writing it back, so
+        # this is safe inside a caller's uncommitted transaction
+        participant = db.session.query(
+            ChatParticipant.is_active, muted_now(datetime.utcnow())
+        ).filter_by(room_id=self.id, user_id=user_id).first()
+        if not participant or not participant[0]:
             return False
-        return not participant.is_muted
+        return not participant[1]
     
-    def to_dict(self):
+    def to_dict(self, participant_count=None):
+        """Serialize the room; pass participant_count when it was already batch-loaded"""
+        if participant_count is None:
+            participant_count = self.get_active_participants_count()
         return {
             'id': self.id,
             'name': self.name,
@@ -106,7 +118,7 @@ class ChatRoom(db.Model):
             'is_public': self.is_public,
             'is_moderated': self.is_moderated,
             'max_participants': self.max_participants,
-            'participant_count': self.get_active_participants_count(),
+            'participant_count': participant_count,
             'created_at': self.created_at.isoformat(),
             'settings': self.settings or {}
         }
@@ -137,17 +149,19 @@ class ChatParticipant(db.Model):
     user = relationship('User', backref=backref('chat_participations', lazy='dynamic'))
     last_read_message = relationship('ChatMessage', foreign_keys=[last_read_message_id])
     
+    __table_args__ = (
+        # One membership row per user and room; the target of join_room's upsert
+        UniqueConstraint(room_id, user_id, name='uq_chat_participants_room_user'),
+        # Active-participant lookups per room skip rows of users who left
+        Index('ix_chat_participants_room_active', room_id,
+              postgresql_where=(is_active == True), sqlite_where=(is_active == True)),
+    )
+    
     def is_currently_muted(self):
-        """Check if user is currently muted"""
+        """Check if user is currently muted (an expired mute counts as lifted)"""
         if not self.is_muted:
             return False
-        if self.muted_until and self.muted_until <= datetime.utcnow():
-            # Mute has expired
-            self.is_muted = False
-            self.muted_until = None
-            db.session.commit()
-            return False
-        return True
+        return self.muted_until is None or self.muted_until > datetime.utcnow()
     
     def get_unread_count(self):
         """Get count of unread messages"""
@@ -155,6 +169,14 @@ class ChatParticipant(db.Model):
             return self.room.messages.count()
         return self.room.messages.filter(ChatMessage.id > self.last_read_message_id).count()
 
+def muted_now(now: datetime):
+    """SQL flag for a participant whose mute is still in force at now"""
+    return case(
+        (and_(ChatParticipant.is_muted == True,
+              or_(ChatParticipant.muted_until == None, ChatParticipant.muted_until > now)), True),
+        else_=False
+    )
+
 class ChatModerator(db.Model):
     """Chat room moderators"""
     __tablename__ = 'chat_moderators'
@@ -178,6 +200,11 @@ class ChatModerator(db.Model):
     # Relationships
     user = relationship('User', foreign_keys=[user_id], backref=backref('moderator_roles', lazy='dynamic'))
     assigner = relationship('User', foreign_keys=[assigned_by])
+    
+    __table_args__ = (
+        # is_user_moderator / add_moderator probe by room and user
+        Index('ix_chat_moderators_room_user', room_id, user_id),
+    )
 
 class ChatMessage(db.Model):
     """Enhanced chat messages"""
@@ -222,28 +249,32 @@ class ChatMessage(db.Model):
     user = relationship('User', foreign_keys=[user_id], backref=backref('chat_messages', lazy='dynamic'))
     deleter = relationship('User', foreign_keys=[deleted_by])
     
+    __table_args__ = (
+        # Paginated room history: newest non-deleted messages first
+        Index('ix_chat_messages_room_deleted_id', room_id, is_deleted, id.desc()),
+    )
+    
+    def _copy_reactions(self):
+        # reactions is a plain JSON column, so in-place edits are not detected;
+        # changes are made on a copy that is then assigned back
+        return {key: list(users) for key, users in (self.reactions or {}).items()}
+    
     def add_reaction(self, emoji, user_id):
-        """Add reaction to message"""
-        if not self.reactions:
-            self.reactions = {}
-        
-        if emoji not in self.reactions:
-            self.reactions[emoji] = []
-        
-        if user_id not in self.reactions[emoji]:
-            self.reactions[emoji].append(user_id)
-            db.session.commit()
+        """Add reaction to message (the caller commits)"""
+        reactions = self._copy_reactions()
+        users = reactions.setdefault(emoji, [])
+        if user_id not in users:
+            users.append(user_id)
+            self.reactions = reactions
     
     def remove_reaction(self, emoji, user_id):
-        """Remove reaction from message"""
-        if not self.reactions or emoji not in self.reactions:
-            return
-        
-        if user_id in self.reactions[emoji]:
-            self.reactions[emoji].remove(user_id)
-            if not self.reactions[emoji]:
-                del self.reactions[emoji]
-            db.session.commit()
+        """Remove reaction from message (the caller commits)"""
+        reactions = self._copy_reactions()
+        if user_id in reactions.get(emoji, []):
+            reactions[emoji].remove(user_id)
+            if not reactions[emoji]:
+                del reactions[emoji]
+            self.reactions = reactions
     
     def get_reaction_count(self, emoji):
         """Get count for specific reaction"""
@@ -280,6 +311,25 @@ class ChatMessage(db.Model):
             }
         
         return data
+    
+    def to_preview_dict(self, content_preview):
+        """Slim summary for message lists; content_preview is the already-truncated content"""
+        data = {
+            'id': self.id,
+            'room_id': self.room_id,
+            'user_id': self.user_id,
+            'content': content_preview,
+            'message_type': self.message_type.value,
+            'created_at': self.created_at.isoformat(),
+        }
+        
+        if self.user:
+            data['user'] = {
+                'id': self.user.id,
+                'username': self.user.username,
+            }
+        
+        return data
 
 class ChatModerationLog(db.Model):
     """Log of moderation actions"""
@@ -384,6 +434,11 @@ class ChatFileShare(db.Model):
     room = relationship('ChatRoom')
     user = relationship('User', backref='uploaded_files')
     
+    __table_args__ = (
+        # File downloads look shares up by their stored name
+        Index('ix_chat_file_shares_stored_filename', stored_filename),
+    )
+    
     def get_file_url(self):
         """Get file download URL"""
         return f"/api/chat/files/{self.id}/download"
@@ -406,4 +461,46 @@ def add_chat_relationships_to_user():
     # This would be called during model initialization
     # User.chat_rooms_created = relationship('ChatRoom', foreign_keys='ChatRoom.created_by')
     # User.chat_messages = relationship('ChatMessage', foreign_keys='ChatMessage.user_id')
-    pass
\ No newline at end of file
+    pass
+
+def upgrade_chat_schema(engine=None):
+    """Bring chat tables created by an older version up to the current schema
+
+    db.create_all() only creates missing tables, so tables from before the
+    membership constraint and the chat indexes were added lack them. This
+    de-duplicates chat_participants and adds uq_chat_participants_room_user
+    (as a unique index, which every dialect can add to an existing table and
+    which join_room's upsert accepts as its conflict target), then creates any
+    declared chat index that is missing. Safe to run on every start.
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    tables = [model.__table__ for model in (ChatParticipant, ChatModerator, ChatMessage, ChatFileShare)]
+    existing = [table for table in tables if inspector.has_table(table.name)]
+    if not existing:
+        return
+    
+    participants = ChatParticipant.__table__
+    with engine.begin() as conn:
+        if participants in existing and not _has_unique_key(inspector, participants.name, {'room_id', 'user_id'}):
+            # Keep the oldest row of each membership; it is the one the old
+            # select-then-insert code found first and kept updating
+            keep = select(func.min(participants.c.id).label('id')).group_by(
+                participants.c.room_id, participants.c.user_id
+            ).subquery('keep')
+            removed = conn.execute(
+                delete(participants).where(participants.c.id.not_in(select(keep.c.id)))
+            ).rowcount
+            Index('uq_chat_participants_room_user', participants.c.room_id, participants.c.user_id,
+                  unique=True).create(conn)
+            logger.info("Added uq_chat_participants_room_user (removed %d duplicate participants)", removed)
+        
+        for table in existing:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+def _has_unique_key(inspector, table_name, columns):
+    """Whether a unique constraint or unique index covers exactly these columns"""
+    keys = [set(c['column_names']) for c in inspector.get_unique_constraints(table_name)]
+    keys += [set(i['column_names']) for i in inspector.get_indexes(table_name) if i.get('unique')]
+    return columns in keys
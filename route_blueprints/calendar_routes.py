@@ -1,13 +1,139 @@
-from flask import Blueprint, render_template, jsonify, request, current_app, g
-from models import Event, User, Ticket
+from flask import Blueprint, render_template, jsonify, request, current_app, copy_current_request_context
+from models import Event, User, EVENT_SEARCH_VECTOR
 from database import db
 from datetime import datetime, timedelta
+from sqlalchemy import case
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session, selectinload, undefer
+from urllib.parse import urlencode
 import calendar as cal
+import functools
 import random
+import threading
+import time
+
+try:
+    from flask_caching import Cache
+    CACHING_AVAILABLE = True
+except ImportError:
+    CACHING_AVAILABLE = False
 
 # Create a Blueprint for calendar routes
 calendar_bp = Blueprint('calendar', __name__, url_prefix='/calendar')
 
+# Short-lived response cache for the aggregate calendar endpoints, shared across
+# workers through Redis when REDIS_URL is set
+cache = Cache() if CACHING_AVAILABLE else None
+
+@calendar_bp.record_once
+def _init_cache(state):
+    if cache is None:
+        return
+    redis_url = state.app.config.get('REDIS_URL')
+    cache.init_app(state.app, config={
+        'CACHE_TYPE': 'RedisCache' if redis_url else 'SimpleCache',
+        'CACHE_REDIS_URL': redis_url,
+        'CACHE_KEY_PREFIX': 'calendar:',
+    })
+
+def _cached(timeout):
+    """Cache a JSON endpoint per query string; failed responses are never cached"""
+    if cache is None:
+        return lambda view: view
+    return cache.cached(
+        timeout=timeout,
+        query_string=True,
+        response_filter=lambda response: bool((response.get_json(silent=True) or {}).get('success')),
+    )
+
+# How long a stale-while-revalidate entry is kept as a fallback for failed refreshes
+_FALLBACK_RETENTION = 24 * 3600
+
+def _stale_while_revalidate(timeout, stale_window):
+    """Cache a JSON endpoint per query string, serving the last good body past its freshness.
+
+    Within ``timeout`` the cached body is served as-is (X-Cache: HIT). For the next
+    ``stale_window`` seconds it is still served (X-Cache: STALE) while one background
+    thread refreshes it. After that the view runs inline (X-Cache: MISS), and if it
+    fails the last good body is returned instead of the error.
+    """
+    def decorator(view):
+        if cache is None:
+            return view
+        
+        def store(key, response):
+            if not (response.get_json(silent=True) or {}).get('success'):
+                return False
+            now = time.time()
+            cache.set(key, {
+                'body': response.get_data(),
+                'fresh_until': now + timeout,
+                'stale_until': now + timeout + stale_window
+            }, timeout=_FALLBACK_RETENTION)
+            return True
+        
+        def refresh(key, args, kwargs):
+            try:
+                store(key, current_app.make_response(view(*args, **kwargs)))
+            except Exception as e:
+                current_app.logger.error(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                cache.delete(f'{key}:refreshing')
+        
+        def respond(body, status):
+            response = current_app.response_class(body, mimetype='application/json')
+            response.headers['X-Cache'] = status
+            return response
+        
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f'swr:{request.path}?{urlencode(sorted(request.args.items(multi=True)))}'
+            entry = cache.get(key)
+            now = time.time()
+            if entry and now < entry['fresh_until']:
+                return respond(entry['body'], 'HIT')
+            if entry and now < entry['stale_until']:
+                # cache.add is atomic, so only one worker refreshes a given key at a time
+                if cache.add(f'{key}:refreshing', 1, timeout=stale_window):
+                    threading.Thread(
+                        target=copy_current_request_context(refresh), args=(key, args, kwargs), daemon=True
+                    ).start()
+                return respond(entry['body'], 'STALE')
+            
+            response = current_app.make_response(view(*args, **kwargs))
+            if not store(key, response) and entry:
+                return respond(entry['body'], 'STALE')
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def _mark_calendar_changed(mapper, connection, target):
+    """Flag the session so its commit drops the cached calendar responses"""
+    session = Session.object_session(target)
+    if session is not None:
+        session.info['calendar_changed'] = True
+
+def _invalidate_calendar_cache(session):
+    """Drop cached calendar responses once an event change is committed"""
+    if not session.info.pop('calendar_changed', False):
+        return
+    try:
+        cache.clear()
+    except Exception as e:
+        # Entries still expire on their own within the cache timeout
+        current_app.logger.warning(f"Could not clear calendar cache: {str(e)}")
+
+def _discard_calendar_change(session, previous_transaction):
+    """A rolled-back event change leaves the cached responses valid"""
+    session.info.pop('calendar_changed', None)
+
+if cache is not None:
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        sa_event.listen(Event, _event_name, _mark_calendar_changed)
+    sa_event.listen(Session, 'after_commit', _invalidate_calendar_cache)
+    sa_event.listen(Session, 'after_soft_rollback', _discard_calendar_change)
+
 # Helper function to get month calendar grid
 def get_month_calendar(year, month):
     c = cal.monthcalendar(year, month)
@@ -28,18 +154,21 @@ def calendar():
     return render_template('calendar/calendar.html', title='Event Calendar')
 
 @calendar_bp.route('/api/statistics')
+@_stale_while_revalidate(timeout=60, stale_window=600)
 def get_statistics():
     """Get calendar statistics"""
     # Calculate dates for filtering
     today = datetime.now().date()
     week_end = today + timedelta(days=7)
     
-    # Query database for counts
+    # Query database for all four counts in a single pass over the events
     try:
-        total_events = Event.query.count()
-        upcoming_events = Event.query.filter(Event.start_date >= today).count()
-        today_events = Event.query.filter(db.func.date(Event.start_date) == today).count()
-        week_events = Event.query.filter(Event.start_date >= today, Event.start_date <= week_end).count()
+        total_events, upcoming_events, today_events, week_events = db.session.query(
+            db.func.count(Event.id),
+            db.func.count(case((Event.start_date >= today, 1))),
+            db.func.count(case((db.func.date(Event.start_date) == today, 1))),
+            db.func.count(case(((Event.start_date >= today) & (Event.start_date <= week_end), 1)))
+        ).one()
         
         return jsonify({
             'success': True,
@@ -58,24 +187,22 @@ def get_statistics():
         })
 
 @calendar_bp.route('/api/categories')
+@_stale_while_revalidate(timeout=30, stale_window=300)
 def get_categories():
     """Get event categories with counts"""
     try:
-        # This implementation depends on your Event model schema
-        # Here's a simplified version - you might need to adjust this based on your actual model
+        # Count events by category in the database, in the order each category first appears
         categories = {}
-        events = Event.query.all()
+        rows = db.session.query(Event.category, db.func.count(Event.id)).group_by(
+            Event.category
+        ).order_by(db.func.min(Event.id)).all()
         
-        # Count events by category
-        for event in events:
-            cat_value = event.category.value if event.category else 'Other'
-            if cat_value in categories:
-                categories[cat_value] += 1
-            else:
-                categories[cat_value] = 1
+        for category, count in rows:
+            cat_value = category.value if category else 'Other'
+            categories[cat_value] = categories.get(cat_value, 0) + count
         
         # Format for select dropdown
-        formatted_categories = [{'value': 'all', 'label': 'All Categories', 'count': len(events)}]
+        formatted_categories = [{'value': 'all', 'label': 'All Categories', 'count': sum(categories.values())}]
         for cat, count in categories.items():
             formatted_categories.append({
                 'value': cat,
@@ -95,12 +222,14 @@ def get_categories():
         })
 
 @calendar_bp.route('/api/month-view')
+@_cached(timeout=30)
 def month_view():
     """Get month view data"""
     try:
         # Get query parameters
-        year = int(request.args.get('year', datetime.now().year))
-        month = int(request.args.get('month', datetime.now().month))
+        now = datetime.now()
+        year = int(request.args.get('year', now.year))
+        month = int(request.args.get('month', now.month))
         
         # Get calendar grid
         calendar_grid = get_month_calendar(year, month)
@@ -112,7 +241,8 @@ def month_view():
         else:
             end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
         
-        events = Event.query.filter(
+        # Only the columns the grid shows
+        events = db.session.query(Event.id, Event.title, Event.start_date).filter(
             Event.start_date >= start_date,
             Event.start_date <= end_date
         ).all()
@@ -149,43 +279,43 @@ def month_view():
         })
 
 @calendar_bp.route('/api/week-view')
+@_cached(timeout=30)
 def week_view():
     """Get week view data"""
     try:
         # Get start date from query parameters or use current date
+        today = datetime.now().date()
         week_start_str = request.args.get('week_start')
         if week_start_str:
             week_start = datetime.fromisoformat(week_start_str).date()
         else:
-            today = datetime.now().date()
             # Calculate the Monday of the current week
             week_start = today - timedelta(days=today.weekday())
         
         # Calculate the end of the week (Sunday)
         week_end = week_start + timedelta(days=6)
         
-        # Get events for this week
-        events = Event.query.filter(
+        # Get events for this week, grouped by day in one pass
+        events = db.session.query(Event.id, Event.title, Event.start_date).filter(
             Event.start_date >= week_start,
             Event.start_date <= week_end
         ).all()
         
+        events_by_date = {}
+        for event in events:
+            events_by_date.setdefault(event.start_date.date(), []).append({
+                'id': event.id,
+                'title': event.title,
+                'start_time': event.start_date.strftime('%H:%M') if event.start_date else 'All day',
+                'color': get_random_color()
+            })
+        
         # Prepare daily data
         days = []
         current_date = week_start
-        today = datetime.now().date()
         
         while current_date <= week_end:
-            day_events = [e for e in events if e.start_date.date() == current_date]
-            formatted_events = []
-            
-            for event in day_events:
-                formatted_events.append({
-                    'id': event.id,
-                    'title': event.title,
-                    'start_time': event.start_date.strftime('%H:%M') if event.start_date else 'All day',
-                    'color': get_random_color()
-                })
+            formatted_events = events_by_date.get(current_date, [])
             
             days.append({
                 'date': current_date.isoformat(),
@@ -223,8 +353,15 @@ def day_view():
         else:
             date = datetime.now().date()
         
-        # Get events for this day
-        events = Event.query.filter(db.func.date(Event.start_date) == date).all()
+        # Get events for this day, with organizers and ticket counts loaded up front.
+        # A half-open start_date range (not DATE(start_date) = ...) lets the start_date index serve it
+        day_start = datetime.combine(date, datetime.min.time())
+        events = Event.query.options(
+            selectinload(Event.organizer), undefer(Event.ticket_count)
+        ).filter(
+            Event.start_date >= day_start,
+            Event.start_date < day_start + timedelta(days=1)
+        ).all()
         
         # Format the events
         formatted_events = []
@@ -235,13 +372,13 @@ def day_view():
             
             # If the event has capacity and tickets, calculate spots left
             if event.max_attendees and hasattr(event, 'tickets'):
-                spots_available = event.max_attendees - event.attendees_count()
+                spots_available = event.max_attendees - event.ticket_count
                 can_register = spots_available > 0
             
             # Get organizer info
             organizer = None
             if event.organizer_id:
-                user = User.query.get(event.organizer_id)
+                user = event.organizer
                 if user:
                     organizer = {
                         'id': user.id,
@@ -289,20 +426,23 @@ def search_events():
                 'error': 'Search query is required'
             })
         
-        # Search in event title and description
-        events = Event.query.filter(
-            (Event.title.ilike(f'%{query}%')) | 
-            (Event.description.ilike(f'%{query}%'))
-        ).all()
+        # Search in event title and description: full-text against the GIN index on
+        # PostgreSQL, substring ILIKE scan elsewhere
+        if db.engine.dialect.name == 'postgresql':
+            condition = EVENT_SEARCH_VECTOR.op('@@')(db.func.plainto_tsquery('english', query))
+        else:
+            condition = (Event.title.ilike(f'%{query}%')) | (Event.description.ilike(f'%{query}%'))
+        
+        # Join the organizer's username
+        events = db.session.query(
+            Event.id, Event.title, Event.description, Event.start_date, Event.location,
+            User.username.label('organizer_username')
+        ).outerjoin(User, Event.organizer_id == User.id).filter(condition).all()
         
         results = []
         for event in events:
             # Get organizer name
-            organizer_name = "Unknown"
-            if event.organizer_id:
-                user = User.query.get(event.organizer_id)
-                if user:
-                    organizer_name = user.username
+            organizer_name = event.organizer_username or "Unknown"
             
             results.append({
                 'id': event.id,
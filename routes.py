@@ -48,8 +48,9 @@ def trigger_integration(integration_func, *args, **kwargs):
 def register_routes(app):
     # Register chat blueprint
     try:
-        from chat_routes import chat_bp
+        from chat_routes import chat_bp, init_download_flusher
         app.register_blueprint(chat_bp)
+        init_download_flusher(app)
         print("✓ Chat routes registered successfully")
     except ImportError as e:
         print(f"⚠ Chat routes not available: {e}")
@@ -4,7 +4,7 @@ Routes for Sustainability Tracking and Assessment Systems
 
 import json
 import asyncio
-from datetime import datetime, timedelta
+import time
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
 from flask_login import login_required, current_user
 
@@ -325,7 +325,7 @@ def submit_decision():
             decision_id=decision_id,
             choice_made=choice,
             rationale=rationale,
-            timestamp=datetime.utcnow(),
+            timestamp_ms=time.time_ns() // 1_000_000,
             time_taken=time_taken,
             confidence_level=confidence
         )
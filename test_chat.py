@@ -5,6 +5,7 @@ Test script for chat room creation functionality
 
 import os
 import sys
+import tempfile
 
 # Add the project directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -13,7 +14,30 @@ from app import app
 from database import db
 from models import User
 from chat_manager import get_chat_manager
-from models_chat import ChatRoomType
+from models_chat import ChatParticipant, ChatRoomType, upgrade_chat_schema
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# chat_participants as created before the one-row-per-membership constraint existed
+LEGACY_PARTICIPANTS_DDL = """
+CREATE TABLE chat_participants (
+    id INTEGER NOT NULL,
+    room_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    is_active BOOLEAN,
+    is_muted BOOLEAN,
+    muted_until DATETIME,
+    joined_at DATETIME,
+    last_seen DATETIME,
+    last_read_message_id INTEGER,
+    notifications_enabled BOOLEAN,
+    sound_enabled BOOLEAN,
+    PRIMARY KEY (id),
+    FOREIGN KEY(room_id) REFERENCES chat_rooms (id),
+    FOREIGN KEY(user_id) REFERENCES user (id),
+    FOREIGN KEY(last_read_message_id) REFERENCES chat_messages (id)
+)
+"""
 
 
 def test_room_creation():
@@ -93,6 +117,54 @@ def test_room_listing():
             return False
 
 
+def test_legacy_schema_upgrade():
+    """Test that an existing chat_participants table is upgraded for join_room's upsert"""
+    
+    participants = ChatParticipant.__table__
+    
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}")
+        try:
+            # Pre-existing table holding a duplicated membership
+            with engine.begin() as conn:
+                conn.exec_driver_sql(LEGACY_PARTICIPANTS_DDL)
+                conn.execute(insert(participants), [
+                    {'id': 1, 'room_id': 1, 'user_id': 1, 'is_active': True},
+                    {'id': 2, 'room_id': 1, 'user_id': 1, 'is_active': False},
+                    {'id': 3, 'room_id': 1, 'user_id': 2, 'is_active': False},
+                ])
+            
+            # Running it again must be a no-op
+            upgrade_chat_schema(engine)
+            upgrade_chat_schema(engine)
+            
+            # The upsert join_room issues needs the (room_id, user_id) unique key
+            with engine.begin() as conn:
+                conn.execute(sqlite_insert(participants).values(room_id=1, user_id=2, is_active=True)
+                             .on_conflict_do_update(index_elements=['room_id', 'user_id'],
+                                                    set_={'is_active': True}))
+                rows = conn.execute(
+                    select(participants.c.id, participants.c.user_id, participants.c.is_active)
+                    .order_by(participants.c.id)
+                ).all()
+            
+            expected = [(1, 1, True), (3, 2, True)]
+            if [tuple(row) for row in rows] != expected:
+                print(f"❌ Unexpected participants after upgrade: {rows}")
+                return False
+            
+            print("✓ Duplicate membership removed and upsert succeeded on the upgraded table")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Exception during schema upgrade: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+        finally:
+            engine.dispose()
+
+
 def main():
     """Main test function"""
     print("🧪 Testing EVENTSYNC Chat Room Creation")
@@ -106,19 +178,24 @@ def main():
     print("\n📋 Test 2: Room Listing")
     listing_success = test_room_listing()
     
+    # Test 3: Upgrading a pre-existing schema
+    print("\n🛠️ Test 3: Legacy Schema Upgrade")
+    upgrade_success = test_legacy_schema_upgrade()
+    
     # Summary
     print("\n" + "=" * 50)
     print("📊 Test Summary:")
     print(f"   Room Creation: {'✅ PASS' if creation_success else '❌ FAIL'}")
     print(f"   Room Listing:  {'✅ PASS' if listing_success else '❌ FAIL'}")
+    print(f"   Schema Upgrade: {'✅ PASS' if upgrade_success else '❌ FAIL'}")
     
-    if creation_success and listing_success:
+    if creation_success and listing_success and upgrade_success:
         print("\n🎉 All tests passed! Room creation is working correctly.")
         print("💡 You can now use the web interface to create rooms.")
     else:
         print("\n⚠️  Some tests failed. Check the error messages above.")
     
-    return creation_success and listing_success
+    return creation_success and listing_success and upgrade_success
 
 
 if __name__ == '__main__':
@@ -549,8 +549,7 @@ class WebSocketManager:
                 )
                 
                 if result['success']:
-                    # Broadcast to all room participants
-                    emit('new_chat_message', result['message'], room=f"chat_{room_id}")
+                    # send_message has already broadcast it to the room
                     logger.info(f"Chat message sent by user {user_id} in room {room_id}")
                     
                 else: